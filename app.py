@@ -1,14 +1,658 @@
+import time
+SCRIPT_STARTED = time.perf_counter()
+
+import io
+import sqlite3
 import streamlit as st
-import pandas as pd
+from concurrent.futures import Future, as_completed
 from datetime import datetime
-from process_github_data import *
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
-from util import load_css
-from fetch_github_data import *
+from typing import TYPE_CHECKING
+from process_github_data import analyze_range, process_contribution_data, process_language_data, process_user_data
+from contribution_series import (
+    ROLLUP_UNITS, ContributionIndex, ContributionSeries, aggregate_contributions, downsample, merge_segments, rollup,
+    summarize_segment,
+)
+from util import SHOW_TIMINGS, load_css, record_timing, timing_summary
+import calendar_store
+from github_client import LOW
+from payloads import series_payload
+from session_store import get_report, keep_sidebar_inputs, predictions_failed, report_key, save_report, share_predictions
+from fetch_github_data import (
+    CACHE_MAX_ENTRIES, fetch_concurrently, fetch_contribution_data, fetch_overview_data, fetch_repo_data,
+    fetch_user_data, future_result, iter_repo_pages, rate_limit_summary, split_overview_data, submit_calendar_ranges,
+    submit_fetch, submit_lifetime_fetch
+)
+
+# pandas, matplotlib and plotly are imported by the sections that draw with them
+if TYPE_CHECKING:
+    import pandas as pd
+
+record_timing("imports", SCRIPT_STARTED)
 
 color = "#26a641"
 
+# Rendered figures kept across reruns and sessions
+FIGURE_CACHE_ENTRIES = 64
+
+# Most points sent to the browser per timeline chart, whatever the length of the history
+TIMELINE_POINTS = 500
+TIMELINE_TABS = {"D": "Daily", "W": "Weekly", "M": "Monthly"}
+
+# Each section is drawn as soon as every result it depends on has arrived
+SECTIONS = {
+    "card": ("user",),
+    "metrics": ("user", "contributions"),
+    "timeline": ("contributions",),
+    "growth": ("contributions", "lastYear"),
+    "visualizations": ("contributions",),
+    "languages": ("languages",),
+    "achievements": ("contributions",),
+}
+
+def start_fetches(username: str, token: str, progressive: bool, lifetime: bool = False) -> dict:
+    """
+    Start every fetch the overview needs and return a Future per result.
+
+    Args:
+        username (str): GitHub username.
+        token (str): GitHub personal access token.
+        progressive (bool): Send profile, calendar and repositories as separate queries so
+            each section can paint as soon as its own query returns. Otherwise they share
+            one combined query.
+        lifetime (bool): Replace the rolling one-year calendar with the full history since
+            the account was created, fetched once the profile's ``createdAt`` is known.
+
+    Returns:
+        dict: Futures keyed by ``"user"``, ``"contributions"``, ``"repos"``, ``"languages"`` and ``"lastYear"``.
+    """
+    last_jan1st = datetime(datetime.now().year-1, 1, 1).strftime("%Y-%m-%d")
+    last_dedc31st = datetime(datetime.now().year-1, 12, 31).strftime("%Y-%m-%d")
+
+    # The current year is always inside the overview calendar, and so is last year for the
+    # lifetime history; otherwise last year is read from the calendar store after an incremental sync
+    ranges = {} if lifetime else submit_calendar_ranges(username, token, {"lastYear": (last_jan1st, last_dedc31st)}, LOW)
+    if progressive:
+        futures = fetch_concurrently({
+            "user": (fetch_user_data, username, token),
+            "contributions": (fetch_contribution_data, username, token),
+            "repos": (fetch_repo_data, username, token),
+        })
+        futures.update(ranges)
+        chain_language_fetch(futures, username, token)
+        return chain_lifetime_fetch(futures, username, token) if lifetime else futures
+
+    # Independent queries go out together; page latency is the slowest of them
+    overview = submit_fetch(fetch_overview_data, username, token)
+    parts = {name: Future() for name in ("user", "contributions", "repos")}
+
+    def split(done):
+        # Resolve the futures created here; the lifetime fetch may replace "contributions" in the result
+        for name, data in split_overview_data(future_result(done)).items():
+            parts[name].set_result(data)
+
+    overview.add_done_callback(split)
+    futures = {**ranges, **parts}
+    chain_language_fetch(futures, username, token)
+    return chain_lifetime_fetch(futures, username, token) if lifetime else futures
+
+def chain_language_fetch(futures: dict, username: str, token: str) -> dict:
+    """
+    Adds a ``"languages"`` future: the language counts over every repository page.
+
+    The remaining pages are fetched and folded on the thread pool once the first page
+    resolves, so a user with thousands of repositories never holds up the other sections.
+    """
+    languages = Future()
+
+    def start(repos_future):
+        repos = future_result(repos_future)
+        if "errors" in repos:
+            languages.set_result(repos)
+            return
+        # Later pages are folded into the counts as they arrive
+        fold = submit_fetch(process_language_data, iter_repo_pages(username, token, first_page=repos))
+        fold.add_done_callback(lambda done: languages.set_result(future_result(done) or {}))
+
+    futures["repos"].add_done_callback(start)
+    futures["languages"] = languages
+    return futures
+
+def chain_lifetime_fetch(futures: dict, username: str, token: str) -> dict:
+    """
+    Swaps the ``"contributions"`` future for the lifetime history, started once the profile resolves,
+    and resolves ``"lastYear"`` from the same history.
+    """
+    contributions = Future()
+
+    def start(user_future):
+        user_data = future_result(user_future)
+        if "errors" in user_data:
+            contributions.set_result(user_data)
+            return
+        try:
+            lifetime = submit_lifetime_fetch(username, token, user_data["created_at"])
+        except Exception as e:
+            contributions.set_result({"errors": str(e)})
+            return
+        lifetime.add_done_callback(lambda done: contributions.set_result(future_result(done)))
+
+    # The lifetime history already covers last year
+    last_year = Future()
+    contributions.add_done_callback(lambda done: last_year.set_result(future_result(done)))
+
+    futures["user"].add_done_callback(start)
+    futures["contributions"] = contributions
+    futures["lastYear"] = last_year
+    return futures
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, hash_funcs={ContributionSeries: ContributionSeries.digest})
+def contribution_cube(series: ContributionSeries):
+    """Yearly, monthly, weekly and weekday breakdowns of a calendar, cached by its content hash."""
+    return aggregate_contributions(series)
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, hash_funcs={ContributionSeries: ContributionSeries.digest})
+def timeline_rollups(series: ContributionSeries, max_points: int = TIMELINE_POINTS) -> dict:
+    """Daily, weekly and monthly totals of a calendar, each downsampled to ``max_points``."""
+    return {unit: downsample(*rollup(series, unit), max_points) for unit in ROLLUP_UNITS}
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def language_pie_png(slices: tuple) -> bytes:
+    """
+    Renders the language pie chart as a PNG, cached by the slices it shows.
+
+    Args:
+        slices (tuple): ``(language, count, color)`` tuples, largest first.
+
+    Returns:
+        bytes: PNG image with a transparent background.
+    """
+    from matplotlib.figure import Figure
+
+    # A bare Figure is never registered with pyplot, so nothing is left open once it is saved
+    fig = Figure(figsize=(8, 8))
+    ax = fig.subplots()
+    ax.pie(
+        [count for _, count, _ in slices],
+        labels=[language for language, _, _ in slices],
+        autopct='%1.1f%%',
+        startangle=90,
+        colors=[color for _, _, color in slices],
+        textprops={'color': 'white', 'fontsize': 12},
+        wedgeprops={'edgecolor': 'white', 'linewidth': 1}
+    )
+    ax.axis('equal')
+
+    # Make the figure background transparent
+    fig.patch.set_alpha(0.0)
+    ax.patch.set_alpha(0.0)
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=200, bbox_inches="tight")
+    return buffer.getvalue()
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def weekday_figure_spec(values: tuple, days: tuple) -> dict:
+    """
+    Builds the day-of-week bar chart as a Plotly figure spec, cached by its counts.
+
+    Args:
+        values (tuple): Contributions per day, in display order.
+        days (tuple): Day names, in display order.
+
+    Returns:
+        dict: Figure spec that ``st.plotly_chart`` accepts.
+    """
+    import plotly.graph_objects as go
+
+    # Create Plotly bar chart
+    fig = go.Figure(go.Bar(
+        x=list(values),
+        y=list(days),
+        orientation='h',
+        marker_color=color
+    ))
+
+    # Update layout for dark theme compatibility
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='white',
+        showlegend=False,
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=150,  # Reduce the height of the chart
+        xaxis=dict(showgrid=True, gridcolor='rgba(128,128,128,0.2)'),
+        yaxis=dict(showgrid=False)
+    )
+    return fig.to_dict()
+
+def build_chart_data(starts, totals) -> "pd.DataFrame":
+    """Builds the contributions frame for one resolution of the timeline."""
+    import pandas as pd
+
+    return pd.DataFrame({"Date": starts.astype("datetime64[ns]"), "Contributions": totals.astype(int)})
+
+def render_user_card(username: str, user_stats: dict):
+    avatar_url = user_stats.get("avatar_url")
+    user_bio = user_stats.get("bio")
+    location = user_stats.get("location")
+    followers = user_stats.get("followers")
+    following = user_stats.get("following")
+    repositories = user_stats.get("repositories")
+    total_prs = user_stats.get("total_pullrequests")
+    total_issues = user_stats.get("total_issues")
+
+    custom_css = load_css()
+    st.markdown(f"""
+                <style>
+                {custom_css}
+                </style>
+                """, unsafe_allow_html=True)
+
+    st.markdown(f"""
+                <div class="user-container">
+                    <div class="user-card">
+                        <img src="{avatar_url}" alt="Avatar" class="avatar">
+                        <div class="username">{username}</div>
+                        <div class="bio">{user_bio}</div>
+                        <div class="stats">
+                            <div class="stat">Location:<b> {location}</b></div>
+                            <div class="stat">Repos:<b> {repositories}</b></div>
+                            <div class="stat">Followers:<b> {followers}</b></div>
+                            <div class="stat">Following:<b> {following}</b></div>
+                            <div class="stat">PRs:<b> {total_prs}</b></div>
+                            <div class="stat">Issues:<b> {total_issues}</b></div>
+                        </div>
+                    </div>
+                </div>
+            """, unsafe_allow_html=True)
+
+def render_summary_metrics(cont_stats: dict, user_stats: dict, show_private: bool):
+    # --- Summary Stats ---
+    public_contributions = cont_stats.get("public_contributions", 0)
+    private_contributions = cont_stats.get("private_contributions", 0)
+    highest_contribution = cont_stats.get("highest_contribution", 0)
+    highest_contribution_date = cont_stats.get("highest_contribution_date", None)
+    current_streak = cont_stats.get("current_streak", 0)
+    longest_streak = cont_stats.get("longest_streak", 0)
+
+    # Validate contribution data
+    if public_contributions == 0 and private_contributions == 0:
+        st.warning("No contributions found. If you have private repositories, make sure your token has the 'repo' scope.")
+
+    # Calculate contributions based on toggle
+    display_total = public_contributions
+    if show_private:
+        display_total += private_contributions
+        if private_contributions == 0:
+            st.info("No private contributions found. If you have private repositories, verify your token permissions.")
+
+    # Display summary metrics
+    col1, col2, col3 = st.columns(3, border=True)
+    col1.metric(
+        "Total Contributions",
+        value= f"{display_total:,} commits",
+        delta=f"Public: {public_contributions:,}" + (f" | Private: {private_contributions:,}" if show_private else ""),
+        delta_color= "off" if display_total == 0 else "normal"
+        )
+    col2.metric(
+        "🔥 Longest Streak",
+        value= f"{longest_streak} days",
+        delta=f"Current Streak: {current_streak} days",
+        delta_color= "off" if current_streak == 0 else "normal"
+        )
+    col3.metric(
+        "Most Productive Day",
+        value= f"{highest_contribution} commits",
+        delta=f"{highest_contribution_date}",
+        delta_color="normal"
+        )
+
+    # Days on GitHub & Active days
+    formatted_date = user_stats.get("formatted_date")
+    joined_since = user_stats.get("joined_since")
+    github_days = user_stats.get("github_days")
+    active_days = cont_stats.get("active_days")
+    less_than_2_months_old = user_stats.get("less_than_2_months_old")
+
+    col1, col2 = st.columns(2, border=True, vertical_alignment="center")
+    col1.metric(
+        label="Joined Github since",
+        value= formatted_date,
+        delta= joined_since,
+        delta_color= "inverse" if less_than_2_months_old else "normal"
+    )
+
+    col2.metric(
+        label="Total days on GitHub",
+        value= f"{github_days} days",
+        delta= f"Active for: {active_days} days",
+        delta_color= "off" if active_days < 7 else "normal"
+    )
+
+def render_timeline(rollups: dict):
+    # --- Contributions Over Time ---
+    with st.container(border=True):
+        # Tabs switch in the browser, so every resolution is sent (each within TIMELINE_POINTS)
+        for unit, tab in zip(rollups, st.tabs([TIMELINE_TABS[unit] for unit in rollups])):
+            tab.line_chart(
+                build_chart_data(*rollups[unit]).set_index("Date"),
+                x_label="Date",
+                y_label=f"Contributions",
+                color=color
+            )
+
+def render_growth(whole_year_stats: dict, current_year_stats: dict, last_year_segment=None, current_year_segment=None):
+    with st.container(border=True):
+        # --- 365 days stats ---
+        total_contributions_ly = whole_year_stats.get('total_contributions')
+        total_days_ly = whole_year_stats.get('total_days')
+        contribution_rate_ly = whole_year_stats.get('contribution_rate')
+        active_days_ly = whole_year_stats.get('active_days')
+        percent_active_days_ly = (whole_year_stats.get('active_days')/total_days_ly)*100 if total_days_ly else 0
+
+        st.markdown(f"#### :material/calendar_month: **Last year contributions({datetime.now().year-1}):**")
+        col1, col2 = st.columns(2)
+        col1.metric(
+            label="Total Contributions",
+            value=f"{total_contributions_ly} commits",
+            delta=f"{contribution_rate_ly:.2f} contributions/day",
+            delta_color="inverse" if contribution_rate_ly < 1 else "normal",
+            border=True
+            )
+
+        col2.metric(
+            label="Active Days",
+            value=f"{active_days_ly} days",
+            delta=f"{percent_active_days_ly:.1f}% days active",
+            delta_color="inverse" if percent_active_days_ly < 8 else "normal",
+            border=True
+            )
+
+        # --- Current year stats ---
+        total_contributions = current_year_stats.get('total_contributions')
+        total_days = current_year_stats.get('total_days')
+        contribution_rate = current_year_stats.get('contribution_rate')
+        active_days = current_year_stats.get('active_days')
+        percent_active_days = (current_year_stats.get('active_days')/total_days)*100 if total_days else 0
+
+        st.markdown(f"#### :material/calendar_today: **Contributions in current year({datetime.now().year}):**")
+        col1, col2 = st.columns(2)
+        col1.metric(
+            label="Total Contributions",
+            value=f"{total_contributions} commits",
+            delta=f"{contribution_rate:.2f} contributions/day",
+            delta_color="inverse" if contribution_rate < 1 else "normal",
+            border=True
+            )
+
+        col2.metric(
+            label="Active Days",
+            value=f"{active_days}/{total_days} days",
+            delta=f"{percent_active_days:.1f}% days active",
+            delta_color="inverse" if percent_active_days < 8 else "normal",
+            border=True
+            )
+
+        # --- Streaks, including runs that carry over New Year ---
+        both_years = merge_segments(last_year_segment, current_year_segment)
+        if both_years is not None:
+            st.caption(
+                f"Longest streak: {last_year_segment.longest_run if last_year_segment else 0} days in {datetime.now().year-1}, "
+                f"{current_year_segment.longest_run if current_year_segment else 0} days in {datetime.now().year}, "
+                f"{both_years.longest_run} days across both years"
+            )
+
+def render_visualizations(cube):
+    import pandas as pd
+
+    # --- Growth and Statistics ---
+    yearly_contributions = pd.Series(cube.year_totals, index=pd.Index(cube.years, name="Year"), name="Contributions")
+
+    col1, col2 = st.columns(2, border=True, vertical_alignment="center")
+
+    col1.markdown("### Yearly Growth")
+    col1.bar_chart(yearly_contributions, color=color)
+
+    # --- Weekday vs. Weekend Contributions ---
+    col2.markdown("### Weekday vs. Weekend")
+    with col2.container(border=True):
+        weekend_data = pd.Series(cube.weekend_totals, index=["Weekdays", "Weekends"], name="Contributions")
+        st.bar_chart(weekend_data, color=color, horizontal=True)
+
+    # --- Contributions by Day of Week ---
+    col2.markdown("### By Day of Week")
+    with col2.container(border=True):
+        # Reversed order (the cube starts on Monday) for top-to-bottom display
+        correct_order = ["Sunday", "Saturday", "Friday", "Thursday", "Wednesday", "Tuesday", "Monday"]
+        values = cube.weekday_totals[::-1].tolist()
+
+        # Display the Plotly chart, rebuilt only when the counts change
+        st.plotly_chart(weekday_figure_spec(tuple(values), tuple(correct_order)), width="stretch", config={'displayModeBar': False})
+
+def render_languages(repo_stats: dict):
+    import pandas as pd
+
+    if repo_stats:
+        with st.container(border=True):
+            col1, col2 = st.columns([3,1], vertical_alignment="center", gap="small")
+            # Sort languages by count and take top 6 languages
+            sorted_data = dict(sorted(repo_stats.items(), key=lambda x: x[1]['count'], reverse=True))
+            top_languages = dict(list(sorted_data.items())[:6])
+
+            # Add "Others" category for remaining languages
+            remaining_languages = dict(list(sorted_data.items())[6:])
+            if remaining_languages:
+                others_count = sum(lang_data['count'] for lang_data in remaining_languages.values())
+                top_languages["Others"] = {"count": others_count, "color": "#808080"}  # Gray for "Others"
+
+            # Calculate percentages
+            total = sum(lang_data["count"] for lang_data in sorted_data.values())
+
+            # Rendered once per distinct breakdown and shared across sessions
+            pie_slices = tuple((name, lang_data["count"], lang_data["color"]) for name, lang_data in top_languages.items())
+            col2.image(language_pie_png(pie_slices), width="stretch")
+
+            # Display language breakdown in a table
+            col1.markdown("#### Language Breakdown")
+            lang_df = pd.DataFrame({
+                "Language": top_languages.keys(),
+                "Repositories": [lang_data["count"] for lang_data in top_languages.values()],
+                "Percentage": [f"{lang_data['count'] / total:.1%}" for lang_data in top_languages.values()]
+            })
+            col1.dataframe(lang_df, hide_index=True)
+    else:
+        st.warning("No language data available for the user's repositories.")
+
+def render_achievements(cont_stats: dict):
+    # Custom Achievements (based on visible contributions)
+    st.success("Keep growing your GitHub stats to unlock more achievements! 🚀", icon="💪")
+    streak_cont, contr_cont = st.columns(2)
+    # Define achievements with their criteria and thresholds
+    streak_achievements = {
+        "Streak Beginner": {"required": 2, "criteria": "Made contributions for 2 consecutive days"},
+        "Streak Novice": {"required": 7, "criteria": "Made contributions for 7 consecutive days"},
+        "Streak Apprentice": {"required": 14, "criteria": "Made contributions for 14 consecutive days"},
+        "Streak Journeyman": {"required": 30, "criteria": "Made contributions for 30 consecutive days"},
+        "Streak Expert": {"required": 60, "criteria": "Made contributions for 60 consecutive days"},
+        "Streak Master": {"required": 90, "criteria": "Made contributions for 90 consecutive days"},
+        "Streak Legend": {"required": 120, "criteria": "Made contributions for 120+ consecutive days"}
+    }
+
+    contribution_achievements = {
+        "Contributor": {"required": 50, "criteria": "Made your first 50 contributions"},
+        "Regular Contributor": {"required": 100, "criteria": "Reached 100 total contributions"},
+        "Active Contributor": {"required": 500, "criteria": "Reached 500 total contributions"},
+        "Dedicated Contributor": {"required": 1000, "criteria": "Reached 1,000 total contributions"},
+        "Seasoned Contributor": {"required": 5000, "criteria": "Reached 5,000 total contributions"},
+        "GitHub Legend": {"required": 10000, "criteria": "Reached 10,000+ total contributions"}
+    }
+
+    # Display Streak Achievements
+    with streak_cont.container(border=True):
+        st.subheader("🔥 Streak Achievements")
+        com_cont = st.container(border=False)
+        inc_exp = st.expander(label="Locked Achievements", icon="🔒")
+        # Unlocked by the longest run ever reached; locked ones show progress of the live streak
+        current_streak = cont_stats.get("current_streak", 0)
+        longest_streak = cont_stats.get("longest_streak", 0)
+
+        for title, details in streak_achievements.items():
+            progress = min(100, (current_streak / details["required"]) * 100)
+            if longest_streak >= details["required"]:
+                emoji = "✅"
+                com_cont.markdown(f"{emoji} **:green[{title}]** : *{details['criteria']}*")
+            else:
+                emoji = "🔒"
+                col1, col2 = inc_exp.columns([2, 1])
+                col1.markdown(f"{emoji} **:orange[{title}]**")
+                col1.markdown(f"*{details['criteria']}*")
+                col2.markdown(f"**Progress: :orange[:orange-background[{progress:.1f}%]]**")
+                if progress > 0:
+                    inc_exp.progress(progress / 100, text=f":blue[{current_streak}/{details['required']}]")
+                    inc_exp.divider()
+
+    # Display Contribution Achievements
+    total_contributions = cont_stats.get("total_contributions", 0)
+    with contr_cont.container(border=True):
+        st.subheader("🏆 Contribution Achievements")
+        com_cont = st.container(border=False)
+        inc_exp = st.expander(label="Locked Achievements", icon="🔒")
+        for title, details in contribution_achievements.items():
+            progress = min(100, (total_contributions / details["required"]) * 100)
+            if total_contributions >= details["required"]:
+                emoji = "✅"
+                com_cont.markdown(f"{emoji} **:green[{title}]** : *{details['criteria']}*")
+            else:
+                emoji = "🔒"
+                col1, col2 = inc_exp.columns([2, 1])
+                col1.markdown(f"{emoji} **:orange[{title}]**")
+                col1.markdown(f"*{details['criteria']}*")
+                col2.markdown(f"**Progress: :orange[:orange-background[{progress:.1f}%]]** ")
+                if progress > 0:
+                    inc_exp.progress(progress / 100, text=f":blue[{total_contributions}/{details['required']}]")
+                    inc_exp.divider()
+
+def growth_stats(last_year_series: ContributionSeries, overview_series: ContributionSeries) -> tuple:
+    """Last and current year's stats and streak segments, in ``render_growth`` argument order."""
+    # Both years are range queries over last year's days joined with the overview calendar
+    series = ContributionSeries.concat([last_year_series, overview_series])
+    index = ContributionIndex(series)
+    last_year = (f"{datetime.now().year-1}-01-01", f"{datetime.now().year-1}-12-31")
+    current_year = (f"{datetime.now().year}-01-01", datetime.now().strftime("%Y-%m-%d"))
+    return (
+        analyze_range(index, *last_year),
+        analyze_range(index, *current_year),
+        summarize_segment(series.between(*last_year)),
+        summarize_segment(series.between(*current_year))
+    )
+
+def share_history(username: str, token: str, results: dict):
+    """
+    Hands last year and this year to the predictions page, unless it already has them.
+
+    The predictions page then opens without a request, with its stats prepared in the background.
+    """
+    if predictions_failed(get_report(report_key(username, token))):
+        series = ContributionSeries.concat([results["lastYear"]["series"], results["contributions"]["series"]])
+        history = series.between(f"{datetime.now().year-1}-01-01", datetime.now().strftime("%Y-%m-%d"))
+        share_predictions(username, token, series_payload(history))
+
+def render_section(name: str, results: dict, username: str, token: str, show_private: bool):
+    """
+    Draws one overview section from the fetch results it depends on.
+
+    Stats derived for a section are kept in ``results`` so later reruns only redraw them.
+    """
+    if name == "card":
+        render_user_card(username, results["user_stats"])
+    elif name == "metrics":
+        render_summary_metrics(results["cont_stats"], results["user_stats"], show_private)
+    elif name == "growth":
+        if "growth_stats" not in results:
+            results["growth_stats"] = growth_stats(results["lastYear"]["series"], results["cont_stats"]["series"])
+        render_growth(*results["growth_stats"])
+    elif name == "languages":
+        render_languages(results["languages"])
+    elif name == "achievements":
+        render_achievements(results["cont_stats"])
+    elif not len(results["cont_stats"]["series"]):
+        if name == "timeline":
+            st.warning("No contribution data available for visualizations.")
+    elif name == "timeline":
+        render_timeline(timeline_rollups(results["cont_stats"]["series"]))
+    elif name == "visualizations":
+        render_visualizations(contribution_cube(results["cont_stats"]["series"]))
+
+def report_failed(report: dict) -> bool:
+    """Whether any finished fetch of a saved report returned an error, so Track should fetch again."""
+    return any(future.done() and "errors" in future_result(future) for future in report["futures"].values())
+
+def render_report(report: dict, username: str, token: str, show_private: bool):
+    """
+    Draws the overview from a saved report, waiting for any fetches still in flight.
+
+    Results and the stats processed from them are added to the report as they arrive, so a
+    rerun (for example after flipping a toggle) redraws them without repeating any work.
+    """
+    futures = report["futures"]
+    results = report["results"]
+
+    # Lay out every section up front so each one can fill in as its data arrives
+    st.markdown("### User Summary")
+    user_info, user_stats_info = st.columns([1,3], border=True, vertical_alignment="center")
+    slots = {"card": user_info.empty(), "metrics": user_stats_info.empty()}
+    st.markdown("### Contributions Over Time")
+    slots["timeline"] = st.empty()
+    st.markdown("### Growth and Statistics")
+    slots["growth"] = st.empty()
+    st.markdown("### Visualizations:")
+    slots["visualizations"] = st.empty()
+    st.markdown("### Programming Languages")
+    slots["languages"] = st.empty()
+    st.markdown("### Achievements")
+    slots["achievements"] = st.empty()
+    for slot in slots.values():
+        slot.caption("Loading...")
+
+    pending = dict(SECTIONS)
+    error_shown = False
+    names = {future: name for name, future in futures.items()}
+    for future in as_completed(names):
+        name = names[future]
+        data = future_result(future)
+        if name not in results:
+            # Process data; results kept from an earlier run of this session are already processed
+            if name == "user" and "errors" not in data:
+                results["user_stats"] = process_user_data(data)
+            elif name == "contributions" and "errors" not in data:
+                results["cont_stats"] = process_contribution_data(data)
+                # Later range lookups on either page reuse these days instead of downloading them again
+                try:
+                    calendar_store.store.save_series(username, token, data["series"])
+                except (sqlite3.Error, OSError) as e:
+                    # The store only saves requests; range lookups fetch directly without it
+                    print(f"Calendar store unavailable: {e}")
+            results[name] = data
+
+            growth_needs = SECTIONS["growth"]
+            if name in growth_needs and all(need in results and "errors" not in results[need] for need in growth_needs):
+                share_history(username, token, results)
+
+        for section, needs in list(pending.items()):
+            if not all(need in results for need in needs):
+                continue
+            del pending[section]
+            if any("errors" in results[need] for need in needs):
+                # Report a failed fetch once rather than in every section that needed it
+                if error_shown:
+                    slots[section].empty()
+                else:
+                    slots[section].error("Error fetching data. Check your username/token.")
+                    error_shown = True
+                continue
+            with slots[section].container():
+                render_section(section, results, username, token, show_private)
+
 def main():
     st.set_page_config(
         page_title = "GitHub Stat Checker",
@@ -20,13 +664,14 @@ def main():
             Built by [:red[TheCarBun]](https://github.com/TheCarBun/) & [:red[Pakagronglb]](https://github.com/pakagronglb)  
             GitHub: [:green[GitHub-Stats]](https://github.com/TheCarBun/GitHub-Stat-Checker)
             """,
-            
+
             "Report a bug": "https://github.com/TheCarBun/GitHub-Stat-Checker/issues",
         }
     )
 
     # Title and input
     st.title("GitHub Contribution Tracker")
+    keep_sidebar_inputs()
     with st.sidebar:
         # with st.expander("❓ How to Use This Tool"):
         #     st.write("""
@@ -36,431 +681,56 @@ def main():
         #     - Export the data for further analysis.
         #     """)
         form = st.container(border=True)
-        username = form.text_input("Enter GitHub Username:")
-        token = form.text_input("Enter GitHub Personal Access Token:", type="password", help="Help: [Create Personal Access Token](https://docs.github.com/en/authentication/keeping-your-account-and-data-secure/managing-your-personal-access-tokens#creating-a-personal-access-token-classic)")
-        show_private = form.toggle("Show Private Contributions", value=True, help="Toggle to show/hide private contributions in stats. Requires a token with 'repo' scope.")
-        
+        username = form.text_input("Enter GitHub Username:", key="username")
+        token = form.text_input("Enter GitHub Personal Access Token:", type="password", key="token", help="Help: [Create Personal Access Token](https://docs.github.com/en/authentication/keeping-your-account-and-data-secure/managing-your-personal-access-tokens#creating-a-personal-access-token-classic)")
+        show_private = form.toggle("Show Private Contributions", key="show_private", help="Toggle to show/hide private contributions in stats. Requires a token with 'repo' scope.")
+        lifetime = form.toggle("Lifetime History", key="lifetime", help="Compute streaks, yearly growth and achievements over your whole GitHub history instead of the last 12 months.")
+        progressive = form.toggle("Progressive Loading", key="progressive", help="Show each section as soon as its own data arrives. Turn off to load everything with fewer requests.")
+
         # Add warning about token permissions if showing private contributions
         if show_private:
             form.info("To view private contributions, make sure your token has the 'repo' scope enabled.", icon="ℹ️")
-        
+
         button_pressed = form.button("Track", type="primary")
+        budget_slot = st.empty()
+        timings_slot = st.empty()
 
         with st.container(border=True):
             st.page_link(
-                "app.py", 
-                label="Overview", 
+                "app.py",
+                label="Overview",
                 icon="✨",
                 help="ℹ️ Check your GitHub stats and contributions."
                 )
             st.page_link(
-                "./pages/predictions.py", 
-                label="Predictions", 
+                "./pages/predictions.py",
+                label="Predictions",
                 icon="⚡",
                 help="ℹ️ Predict your GitHub contributions."
                 )
 
-    
-    if username and token and button_pressed:
+
+    record_timing("sidebar", SCRIPT_STARTED)
+
+    # Only the username, token and history length change what is fetched; the other
+    # toggles redraw the saved report without fetching or processing anything again
+    key = report_key(username, token, lifetime=lifetime) if username and token else None
+    report = get_report(key) if key else None
+    if key and button_pressed and (report is None or report_failed(report)):
         # Fetch data
-        cont_data = fetch_contribution_data(username, token)
-        user_data = fetch_user_data(username, token)
-        repo_data = fetch_repo_data(username, token)
-
-        if "errors" in cont_data or "errors" in user_data or "errors" in repo_data:
-            st.error("Error fetching data. Check your username/token.")
-        else:
-            # Process data
-            cont_stats = process_contribution_data(cont_data)
-            user_stats = process_user_data(user_data)
-            repo_stats = process_language_data(repo_data)
-
-            # --- User Stats Summary ---
-            st.markdown("### User Summary")
-            with st.container():
-                user_info, user_stats_info = st.columns([1,3], border=True, vertical_alignment="center")
-                with user_info:
-                    avatar_url = user_stats.get("avatar_url")
-                    user_bio = user_stats.get("bio")
-                    location = user_stats.get("location")
-                    followers = user_stats.get("followers")
-                    following = user_stats.get("following")
-                    repositories = user_stats.get("repositories")
-                    total_prs = user_stats.get("total_pullrequests")
-                    total_issues = user_stats.get("total_issues")
-
-                    custom_css = load_css()
-                    st.markdown(f"""
-                                <style>
-                                {custom_css}
-                                </style>
-                                """, unsafe_allow_html=True)
-
-                    st.markdown(f"""
-                                <div class="user-container">
-                                    <div class="user-card">
-                                        <img src="{avatar_url}" alt="Avatar" class="avatar">
-                                        <div class="username">{username}</div>
-                                        <div class="bio">{user_bio}</div>
-                                        <div class="stats">
-                                            <div class="stat">Location:<b> {location}</b></div>
-                                            <div class="stat">Repos:<b> {repositories}</b></div>
-                                            <div class="stat">Followers:<b> {followers}</b></div>
-                                            <div class="stat">Following:<b> {following}</b></div>
-                                            <div class="stat">PRs:<b> {total_prs}</b></div>
-                                            <div class="stat">Issues:<b> {total_issues}</b></div>
-                                        </div>
-                                    </div>
-                                </div>
-                            """, unsafe_allow_html=True)
-
-                with user_stats_info:
-                    # --- Summary Stats ---
-                    total_contributions = cont_stats.get("total_contributions", 0)
-                    public_contributions = cont_stats.get("public_contributions", 0)
-                    private_contributions = cont_stats.get("private_contributions", 0)
-                    highest_contribution = cont_stats.get("highest_contribution", 0)
-                    highest_contribution_date = cont_stats.get("highest_contribution_date", None)
-                    current_streak = cont_stats.get("current_streak", 0)
-                    longest_streak = cont_stats.get("longest_streak", 0)
-                    days = cont_stats.get("days", [])
-
-            
-                    # Validate contribution data
-                    if public_contributions == 0 and private_contributions == 0:
-                        st.warning("No contributions found. If you have private repositories, make sure your token has the 'repo' scope.")
-                
-                    # Calculate contributions based on toggle
-                    display_total = public_contributions
-                    if show_private:
-                        display_total += private_contributions
-                        if private_contributions == 0:
-                            st.info("No private contributions found. If you have private repositories, verify your token permissions.")
-
-                    # Display summary metrics
-                    col1, col2, col3 = st.columns(3, border=True)
-                    col1.metric(
-                        "Total Contributions", 
-                        value= f"{display_total:,} commits",
-                        delta=f"Public: {public_contributions:,}" + (f" | Private: {private_contributions:,}" if show_private else ""),
-                        delta_color= "off" if display_total == 0 else "normal"
-                        )
-                    col2.metric(
-                        "🔥 Longest Streak", 
-                        value= f"{longest_streak} days",
-                        delta=f"Current Streak: {current_streak} days",
-                        delta_color= "off" if current_streak == 0 else "normal"
-                        )
-                    col3.metric(
-                        "Most Productive Day",
-                        value= f"{highest_contribution} commits",
-                        delta=f"{highest_contribution_date}",
-                        delta_color="normal"
-                        )
-                    
-                    # Days on GitHub & Active days
-                    formatted_date = user_stats.get("formatted_date")
-                    joined_since = user_stats.get("joined_since")
-                    github_days = user_stats.get("github_days")
-                    active_days = cont_stats.get("active_days")
-                    less_than_2_months_old = user_stats.get("less_than_2_months_old")
-            
-            
-                    col1, col2 = st.columns(2, border=True, vertical_alignment="center")
-                    col1.metric(
-                        label="Joined Github since",
-                        value= formatted_date,
-                        delta= joined_since,
-                        delta_color= "inverse" if less_than_2_months_old else "normal"
-                    )
-
-                    col2.metric(
-                        label="Total days on GitHub",
-                        value= f"{github_days} days",
-                        delta= f"Active for: {active_days} days",
-                        delta_color= "off" if active_days < 7 else "normal"
-                    )
-
-                    
-
-            # Prepare data for visualizations
-            if not days:
-                st.warning("No contribution data available for visualizations.")
-            else:
-                dates = [datetime.strptime(day["date"], "%Y-%m-%d") for day in days]
-                # Add private contributions to daily counts if enabled
-                contributions = [day.get("contributionCount", 0) for day in days]
-
-                # --- Contributions Over Time ---
-                st.markdown("### Contributions Over Time")
-                with st.container(border=True):
-                    chart_data = pd.DataFrame({"Date": dates, "Contributions": contributions})
-                    st.line_chart(
-                        chart_data.set_index("Date"), 
-                        x_label="Date", 
-                        y_label=f"Contributions", 
-                        color=color
-                    )
-
-                # --- Growth and Statistics ---
-                chart_data['Year'] = chart_data['Date'].dt.year
-                yearly_contributions = chart_data.groupby('Year')['Contributions'].sum().round(1)  # Round to 1 decimal
-
-                st.markdown("### Growth and Statistics")
-                with st.container():
-                    # Fetch data
-                    today = datetime.now().strftime("%Y-%m-%d")
-                    current_jan1st = datetime(datetime.now().year, 1, 1).strftime("%Y-%m-%d")
-                    last_jan1st = datetime(datetime.now().year-1, 1, 1).strftime("%Y-%m-%d")
-                    last_dedc31st = datetime(datetime.now().year-1, 12, 31).strftime("%Y-%m-%d")
-
-                    year_data = fetch_data_for_duration(
-                        username, 
-                        token,
-                        from_date= last_jan1st,
-                        to_date= last_dedc31st
-                        )
-
-                    current_year_data = fetch_data_for_duration(
-                        username, 
-                        token,
-                        from_date= current_jan1st,
-                        to_date= today
-                        )
-                    
-                    # Process data
-                    whole_year_stats = analyze_contributions(year_data)
-                    current_year_stats = analyze_contributions(current_year_data)
-
-                    
-                    
-                    with st.container(border=True):
-                        # --- 365 days stats ---
-                        total_contributions_ly = whole_year_stats.get('total_contributions')
-                        total_days_ly = whole_year_stats.get('total_days')
-                        contribution_rate_ly = whole_year_stats.get('contribution_rate')
-                        active_days_ly = whole_year_stats.get('active_days')
-                        percent_active_days_ly = (whole_year_stats.get('active_days')/total_days_ly)*100
-
-                        st.markdown(f"#### :material/calendar_month: **Last year contributions({datetime.now().year-1}):**")
-                        col1, col2 = st.columns(2)
-                        col1.metric(
-                            label="Total Contributions", 
-                            value=f"{total_contributions_ly} commits",
-                            delta=f"{contribution_rate_ly:.2f} contributions/day",
-                            delta_color="inverse" if contribution_rate_ly < 1 else "normal",
-                            border=True
-                            )
-                        
-                        col2.metric(
-                            label="Active Days", 
-                            value=f"{active_days_ly} days",
-                            delta=f"{percent_active_days_ly:.1f}% days active",
-                            delta_color="inverse" if percent_active_days_ly < 8 else "normal",
-                            border=True
-                            )
-                        
-                        # --- Current year stats ---
-                        total_contributions = current_year_stats.get('total_contributions')
-                        total_days = current_year_stats.get('total_days')
-                        contribution_rate = current_year_stats.get('contribution_rate')
-                        active_days = current_year_stats.get('active_days')
-                        percent_active_days = (current_year_stats.get('active_days')/total_days)*100
-
-                        st.markdown(f"#### :material/calendar_today: **Contributions in current year({datetime.now().year}):**")
-                        col1, col2 = st.columns(2)
-                        col1.metric(
-                            label="Total Contributions", 
-                            value=f"{total_contributions} commits",
-                            delta=f"{contribution_rate:.2f} contributions/day",
-                            delta_color="inverse" if contribution_rate < 1 else "normal",
-                            border=True
-                            )
-                        
-                        col2.metric(
-                            label="Active Days", 
-                            value=f"{active_days}/{total_days} days",
-                            delta=f"{percent_active_days:.1f}% days active",
-                            delta_color="inverse" if percent_active_days < 8 else "normal",
-                            border=True
-                            )
-
-                    st.markdown("### Visualizations:")
-                    col1, col2 = st.columns(2, border=True, vertical_alignment="center")
-
-                    col1.markdown("### Yearly Growth")
-                    col1.bar_chart(yearly_contributions, color=color)
-
-                    # --- Weekday vs. Weekend Contributions ---
-                    col2.markdown("### Weekday vs. Weekend")
-                    with col2.container(border=True):
-                        chart_data['IsWeekend'] = chart_data['Date'].dt.dayofweek >= 5
-                        weekend_data = chart_data.groupby('IsWeekend')['Contributions'].sum().round(1)
-                        weekend_data.index = ["Weekdays", "Weekends"]
-                        st.bar_chart(weekend_data, color=color, horizontal=True)
-
-                    # --- Contributions by Day of Week ---
-                    col2.markdown("### By Day of Week")
-                    with col2.container(border=True):
-                        # Ensure the 'Date' column is properly converted to datetime
-                        chart_data["Date"] = pd.to_datetime(chart_data["Date"])
-                        chart_data["Day"] = chart_data["Date"].dt.day_name()
-
-                        # Aggregate contributions by day of the week
-                        day_totals = chart_data.groupby("Day")["Contributions"].sum()
-
-                        # Create ordered lists for plotting (reversed order for top-to-bottom display)
-                        correct_order = ["Sunday", "Saturday", "Friday", "Thursday", "Wednesday", "Tuesday", "Monday"]
-                        values = [day_totals.get(day, 0) for day in correct_order]
-
-                        # Create Plotly bar chart
-                        fig = go.Figure(go.Bar(
-                            x=values,
-                            y=correct_order,
-                            orientation='h',
-                            marker_color=color
-                        ))
-
-                        # Update layout for dark theme compatibility
-                        fig.update_layout(
-                            plot_bgcolor='rgba(0,0,0,0)',
-                            paper_bgcolor='rgba(0,0,0,0)',
-                            font_color='white',
-                            showlegend=False,
-                            margin=dict(l=0, r=0, t=0, b=0),
-                            height=150,  # Reduce the height of the chart
-                            xaxis=dict(showgrid=True, gridcolor='rgba(128,128,128,0.2)'),
-                            yaxis=dict(showgrid=False)
-                        )
-
-                        # Display the Plotly chart
-                        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
-
-            # Add Language Distribution
-            st.markdown("### Programming Languages")
-            
-            if repo_stats:
-                with st.container(border=True):
-                    col1, col2 = st.columns([3,1], vertical_alignment="center", gap="small")
-                    # Sort languages by count and take top 6 languages
-                    sorted_data = dict(sorted(repo_stats.items(), key=lambda x: x[1]['count'], reverse=True))
-                    top_languages = dict(list(sorted_data.items())[:6])
-                    
-                    # Add "Others" category for remaining languages
-                    remaining_languages = dict(list(sorted_data.items())[6:])
-                    if remaining_languages:
-                        others_count = sum(lang_data['count'] for lang_data in remaining_languages.values())
-                        top_languages["Others"] = {"count": others_count, "color": "#808080"}  # Gray for "Others"
-                    
-                    # Create figure with fixed size
-                    fig, ax = plt.subplots(figsize=(8, 8))
-                    
-                    # Calculate percentages
-                    total = sum(lang_data["count"] for lang_data in sorted_data.values())
-                    
-                    # Extract colors from processed data
-                    colors = [lang_data["color"] for lang_data in top_languages.values()]
-                    
-                    # Create pie chart
-                    wedges, texts, autotexts = ax.pie(
-                        [lang_data["count"] for lang_data in top_languages.values()],
-                        labels=top_languages.keys(),
-                        autopct='%1.1f%%',
-                        startangle=90,
-                        colors=colors,
-                        textprops={'color': 'white', 'fontsize': 12},
-                        wedgeprops={'edgecolor': 'white', 'linewidth': 1}
-                    )
-                    
-                    ax.axis('equal')
-                    
-                    # Make the figure background transparent
-                    fig.patch.set_alpha(0.0)
-                    ax.patch.set_alpha(0.0)
-                    
-                    col2.pyplot(fig)
-                    
-                    # Display language breakdown in a table
-                    col1.markdown("#### Language Breakdown")
-                    lang_df = pd.DataFrame({
-                        "Language": top_languages.keys(),
-                        "Repositories": [lang_data["count"] for lang_data in top_languages.values()],
-                        "Percentage": [f"{lang_data['count'] / total:.1%}" for lang_data in top_languages.values()]
-                    })
-                    col1.dataframe(lang_df, hide_index=True)
-            else:
-                st.warning("No language data available for the user's repositories.")
-
-            # Custom Achievements (based on visible contributions)
-            st.markdown("### Achievements")
-            with st.container():
-                st.success("Keep growing your GitHub stats to unlock more achievements! 🚀", icon="💪")
-                streak_cont, contr_cont = st.columns(2)
-                # Define achievements with their criteria and thresholds
-                streak_achievements = {
-                    "Streak Beginner": {"required": 2, "criteria": "Made contributions for 2 consecutive days"},
-                    "Streak Novice": {"required": 7, "criteria": "Made contributions for 7 consecutive days"},
-                    "Streak Apprentice": {"required": 14, "criteria": "Made contributions for 14 consecutive days"},
-                    "Streak Journeyman": {"required": 30, "criteria": "Made contributions for 30 consecutive days"},
-                    "Streak Expert": {"required": 60, "criteria": "Made contributions for 60 consecutive days"},
-                    "Streak Master": {"required": 90, "criteria": "Made contributions for 90 consecutive days"},
-                    "Streak Legend": {"required": 120, "criteria": "Made contributions for 120+ consecutive days"}
-                }
-
-                contribution_achievements = {
-                    "Contributor": {"required": 50, "criteria": "Made your first 50 contributions"},
-                    "Regular Contributor": {"required": 100, "criteria": "Reached 100 total contributions"},
-                    "Active Contributor": {"required": 500, "criteria": "Reached 500 total contributions"},
-                    "Dedicated Contributor": {"required": 1000, "criteria": "Reached 1,000 total contributions"},
-                    "Seasoned Contributor": {"required": 5000, "criteria": "Reached 5,000 total contributions"},
-                    "GitHub Legend": {"required": 10000, "criteria": "Reached 10,000+ total contributions"}
-                }
-
-                # Display Streak Achievements
-                with streak_cont.container(border=True):
-                    st.subheader("🔥 Streak Achievements")
-                    com_cont = st.container(border=False)
-                    inc_exp = st.expander(label="Locked Achievements", icon="🔒")
-                    current_streak = current_streak
-                    
-                    for title, details in streak_achievements.items():
-                        progress = min(100, (current_streak / details["required"]) * 100)
-                        if current_streak >= details["required"]:
-                            emoji = "✅"
-                            com_cont.markdown(f"{emoji} **:green[{title}]** : *{details['criteria']}*")
-                        else:
-                            emoji = "🔒"
-                            col1, col2 = inc_exp.columns([2, 1])
-                            col1.markdown(f"{emoji} **:orange[{title}]**")
-                            col1.markdown(f"*{details['criteria']}*")
-                            col2.markdown(f"**Progress: :orange[:orange-background[{progress:.1f}%]]**")
-                            if progress > 0:
-                                inc_exp.progress(progress / 100, text=f":blue[{current_streak}/{details['required']}]")
-                                inc_exp.divider()
-
-                # Display Contribution Achievements
-                total_contributions = cont_stats.get("total_contributions", 0)
-                with contr_cont.container(border=True):
-                    st.subheader("🏆 Contribution Achievements")
-                    com_cont = st.container(border=False)
-                    inc_exp = st.expander(label="Locked Achievements", icon="🔒")
-                    for title, details in contribution_achievements.items():
-                        progress = min(100, (total_contributions / details["required"]) * 100)
-                        if total_contributions >= details["required"]:
-                            emoji = "✅"
-                            com_cont.markdown(f"{emoji} **:green[{title}]** : *{details['criteria']}*")
-                        else:
-                            emoji = "🔒"
-                            col1, col2 = inc_exp.columns([2, 1])
-                            col1.markdown(f"{emoji} **:orange[{title}]**")
-                            col1.markdown(f"*{details['criteria']}*")
-                            col2.markdown(f"**Progress: :orange[:orange-background[{progress:.1f}%]]** ")
-                            if progress > 0:
-                                inc_exp.progress(progress / 100, text=f":blue[{total_contributions}/{details['required']}]")
-                                inc_exp.divider()
+        report = save_report(key, {"futures": start_fetches(username, token, progressive, lifetime), "results": {}})
+
+    if report is not None:
+        render_report(report, username, token, show_private)
+        record_timing("render", SCRIPT_STARTED)
     else:
         st.info("ℹ️ ***Enter your GitHub username and token in the sidebar to get started.***")
 
+    if username and token and rate_limit_summary(token):
+        budget_slot.caption(rate_limit_summary(token))
+    if SHOW_TIMINGS:
+        timings_slot.caption(f"Timings: {timing_summary()}")
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,238 @@
+import os
+import sqlite3
+import threading
+from datetime import date, timedelta
+
+from contribution_series import ContributionSeries
+from github_client import token_key
+
+DEFAULT_PATH = os.environ.get("GITHUB_STATS_DB", os.path.join(".cache", "calendar.db"))
+
+# Recent days are re-fetched on every sync because GitHub can attribute contributions late
+TRAILING_DAYS = 7
+
+# Bumped whenever the tables change; older stores are only a cache, so they are dropped
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+DROP TABLE IF EXISTS contribution_days;
+DROP TABLE IF EXISTS held_intervals;
+CREATE TABLE contribution_days (
+    username TEXT NOT NULL,
+    token_hash TEXT NOT NULL,
+    day TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (username, token_hash, day)
+);
+CREATE TABLE held_intervals (
+    username TEXT NOT NULL,
+    token_hash TEXT NOT NULL,
+    first_day TEXT NOT NULL,
+    last_day TEXT NOT NULL,
+    PRIMARY KEY (username, token_hash, first_day)
+);
+"""
+
+
+class CalendarStore:
+    """
+    On-disk store of per-user daily contribution counts.
+
+    Alongside the counts, the store tracks which day intervals it holds for each user so
+    any date range can be answered from stored days, fetching only what is missing.
+    Days inside the trailing window are stored but never marked as held, so they are
+    fetched again until GitHub has settled them.
+
+    Counts fetched with a token can include private contributions, so every row is kept
+    per user and token (as a hash); a calendar is only ever served back to the token it
+    was fetched with.
+
+    Store methods raise ``sqlite3.Error`` or ``OSError`` when the database is unavailable.
+
+    Args:
+        path (str): SQLite database file. Parent directories are created on first use.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        # Reentrant so writes can open their connection while holding it
+        self._lock = threading.RLock()
+        self._initialised = False
+
+    def _connect(self) -> sqlite3.Connection:
+        with self._lock:
+            if not self._initialised:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+                try:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    # Check and migrate in one write transaction, so another process
+                    # opening the same file cannot create the tables twice
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                            for statement in SCHEMA.split(";"):
+                                conn.execute(statement)
+                            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                        conn.execute("COMMIT")
+                    except BaseException:
+                        conn.execute("ROLLBACK")
+                        raise
+                finally:
+                    conn.close()
+                self._initialised = True
+        # Transactions are begun explicitly (see ``save_days``)
+        return sqlite3.connect(self.path, timeout=10, isolation_level=None)
+
+    @staticmethod
+    def _owner(username: str, token: str) -> tuple:
+        return username.lower(), token_key(token)
+
+    def held_intervals(self, username: str, token: str) -> list:
+        """
+        Returns:
+            list: ``(first_day, last_day)`` date pairs the store holds for the user and token, oldest first.
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT first_day, last_day FROM held_intervals WHERE username = ? AND token_hash = ? ORDER BY first_day",
+                self._owner(username, token)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [(date.fromisoformat(first), date.fromisoformat(last)) for first, last in rows]
+
+    def save_days(self, username: str, token: str, days: list, first_day: date, last_day: date,
+                  settled_through: date = None):
+        """
+        Upserts daily counts for a fully fetched interval and marks its settled part as held.
+
+        Args:
+            username (str): GitHub username.
+            token (str): GitHub personal access token the days were fetched with.
+            days (list): ``(date_str, count)`` pairs covering ``first_day`` to ``last_day``.
+            first_day (date): First day that was fetched.
+            last_day (date): Last day that was fetched.
+            settled_through (date): Latest day old enough to be final. Defaults to
+                ``TRAILING_DAYS`` before today.
+        """
+        owner = self._owner(username, token)
+        settled_through = settled_through or date.today() - timedelta(days=TRAILING_DAYS)
+
+        # Read, merge and write the held intervals in one write transaction, so concurrent
+        # saves (from other threads or processes) cannot drop each other's intervals
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                rows = conn.execute(
+                    "SELECT first_day, last_day FROM held_intervals WHERE username = ? AND token_hash = ?", owner
+                ).fetchall()
+                held = [(date.fromisoformat(first), date.fromisoformat(last)) for first, last in rows]
+                if first_day <= min(last_day, settled_through):
+                    held = merge_intervals(held + [(first_day, min(last_day, settled_through))])
+
+                conn.executemany(
+                    "INSERT OR REPLACE INTO contribution_days (username, token_hash, day, count) VALUES (?, ?, ?, ?)",
+                    [(*owner, day, count) for day, count in days]
+                )
+                conn.execute("DELETE FROM held_intervals WHERE username = ? AND token_hash = ?", owner)
+                conn.executemany(
+                    "INSERT INTO held_intervals (username, token_hash, first_day, last_day) VALUES (?, ?, ?, ?)",
+                    [(*owner, first.isoformat(), last.isoformat()) for first, last in held]
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+
+    def save_series(self, username: str, token: str, series: ContributionSeries):
+        """
+        Stores an already fetched calendar (e.g. from ``fetch_contribution_data``) so later
+        range lookups with the same token can reuse its days.
+        """
+        if len(series):
+            self.save_days(username, token, series.items(), date.fromisoformat(series.date_at(0)), date.fromisoformat(series.date_at(-1)))
+
+    def load_days(self, username: str, token: str, from_date: str = None, to_date: str = None) -> list:
+        """
+        Returns:
+            list: ``(date_str, count)`` pairs between ``from_date`` and ``to_date`` inclusive, oldest first.
+        """
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT day, count FROM contribution_days WHERE username = ? AND token_hash = ? AND day >= ? AND day <= ? ORDER BY day",
+                (*self._owner(username, token), from_date or "0000-00-00", to_date or "9999-99-99")
+            ).fetchall()
+        finally:
+            conn.close()
+
+    def load_series(self, username: str, token: str, from_date: str = None, to_date: str = None) -> ContributionSeries:
+        """
+        Reads stored days back as a ``ContributionSeries``.
+
+        Args:
+            username (str): GitHub username.
+            token (str): GitHub personal access token the days were fetched with.
+            from_date (str): First day to include ('YYYY-MM-DD'), or None for all stored days.
+            to_date (str): Last day to include ('YYYY-MM-DD'), or None for all stored days.
+
+        Returns:
+            ContributionSeries: The stored days in the range.
+        """
+        days = self.load_days(username, token, from_date, to_date)
+        return ContributionSeries.from_days([day for day, _ in days], [count for _, count in days])
+
+
+def merge_intervals(intervals: list) -> list:
+    """
+    Merges overlapping or adjacent ``(first_day, last_day)`` date pairs.
+
+    Returns:
+        list: Disjoint date pairs, oldest first.
+    """
+    merged = []
+    for first, last in sorted(intervals):
+        if merged and first <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def missing_intervals(held: list, from_date: date, to_date: date) -> list:
+    """
+    Works out which parts of a date range are not held yet.
+
+    Args:
+        held (list): Disjoint ``(first_day, last_day)`` date pairs, oldest first.
+        from_date (date): First day of the requested range.
+        to_date (date): Last day of the requested range.
+
+    Returns:
+        list: ``(first_day, last_day)`` date pairs to fetch, oldest first.
+    """
+    missing = []
+    cursor = from_date
+    for first, last in held:
+        if last < cursor:
+            continue
+        if first > to_date:
+            break
+        if first > cursor:
+            missing.append((cursor, first - timedelta(days=1)))
+        cursor = last + timedelta(days=1)
+    if cursor <= to_date:
+        missing.append((cursor, to_date))
+    return missing
+
+
+# Shared by every session in the process
+store = CalendarStore()
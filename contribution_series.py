@@ -0,0 +1,480 @@
+import hashlib
+from datetime import date
+from functools import reduce
+from typing import NamedTuple
+
+import numpy as np
+
+# date.toordinal() of 1970-01-01, the numpy datetime64 epoch
+EPOCH_ORDINAL = 719163
+
+
+class ContributionSeries:
+    """
+    Compact daily contribution counts, built once per GraphQL response.
+
+    Days are held as two parallel NumPy arrays (sorted, unique ``date.toordinal()``
+    values and their counts) instead of one dict per day.
+
+    Args:
+        ordinals (array-like): Day ordinals, oldest first and without duplicates.
+        counts (array-like): Contribution count for each day.
+    """
+
+    __slots__ = ("ordinals", "counts")
+
+    def __init__(self, ordinals, counts):
+        counts = np.asarray(counts)
+        dtype = np.uint16 if not len(counts) or counts.max() <= np.iinfo(np.uint16).max else np.uint32
+        self.ordinals = np.asarray(ordinals, dtype=np.int32)
+        self.counts = counts.astype(dtype)
+
+    @classmethod
+    def empty(cls) -> "ContributionSeries":
+        return cls([], [])
+
+    @classmethod
+    def from_days(cls, dates, counts) -> "ContributionSeries":
+        """
+        Builds a series from parallel 'YYYY-MM-DD' strings and counts in any order.
+
+        Repeated dates keep their last count.
+        """
+        if not len(dates):
+            return cls.empty()
+        ordinals = np.array(dates, dtype="datetime64[D]").astype(np.int64) + EPOCH_ORDINAL
+        counts = np.asarray(counts)
+        # Reverse before de-duplicating so the last occurrence of each day wins
+        ordinals, index = np.unique(ordinals[::-1], return_index=True)
+        return cls(ordinals, counts[::-1][index])
+
+    @classmethod
+    def from_response(cls, data: dict) -> "ContributionSeries":
+        """
+        Builds a series from a GraphQL response containing a contribution calendar.
+
+        Args:
+            data (dict): JSON response, e.g. from ``fetch_contribution_data``.
+
+        Returns:
+            ContributionSeries: The calendar's days.
+
+        Raises:
+            KeyError: If the response has no contribution calendar.
+        """
+        weeks = data["data"]["user"]["contributionsCollection"]["contributionCalendar"]["weeks"]
+        days = [day for week in weeks for day in week["contributionDays"]]
+        return cls.from_days([day["date"] for day in days], [day["contributionCount"] for day in days])
+
+    @classmethod
+    def concat(cls, parts) -> "ContributionSeries":
+        """
+        Joins several series, e.g. a year range and a rolling calendar, into one.
+
+        Where series overlap, the day's count from the later series wins.
+        """
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.empty()
+        ordinals = np.concatenate([part.ordinals for part in parts])
+        counts = np.concatenate([part.counts.astype(np.uint32) for part in parts])
+        ordinals, index = np.unique(ordinals[::-1], return_index=True)
+        return cls(ordinals, counts[::-1][index])
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Days as a ``datetime64[D]`` array."""
+        return (self.ordinals.astype(np.int64) - EPOCH_ORDINAL).astype("datetime64[D]")
+
+    def digest(self) -> str:
+        """Content hash of the days and counts, for caching results derived from the series."""
+        digest = hashlib.blake2b(self.ordinals.tobytes(), digest_size=16)
+        digest.update(self.counts.astype(np.uint32).tobytes())
+        return digest.hexdigest()
+
+    def items(self) -> list:
+        """Returns ``(date_str, count)`` pairs, oldest first."""
+        return list(zip(np.datetime_as_string(self.dates).tolist(), self.counts.tolist()))
+
+    def date_at(self, index: int) -> str:
+        """Returns the day at ``index`` in 'YYYY-MM-DD' format."""
+        return date.fromordinal(int(self.ordinals[index])).isoformat()
+
+    def between(self, from_date: str = None, to_date: str = None) -> "ContributionSeries":
+        """
+        Returns the days between ``from_date`` and ``to_date`` inclusive ('YYYY-MM-DD').
+
+        The arrays are sliced, not copied.
+        """
+        start = 0 if from_date is None else np.searchsorted(self.ordinals, date.fromisoformat(from_date).toordinal())
+        end = len(self) if to_date is None else np.searchsorted(self.ordinals, date.fromisoformat(to_date).toordinal(), side="right")
+        series = ContributionSeries.__new__(ContributionSeries)
+        series.ordinals = self.ordinals[start:end]
+        series.counts = self.counts[start:end]
+        return series
+
+
+def streak_stats(series: ContributionSeries, today: date = None) -> dict:
+    """
+    Finds every run of consecutive active days with vectorised run-length encoding.
+
+    A run breaks on a day without contributions and on any day missing from the series.
+
+    Args:
+        series (ContributionSeries): Daily contribution counts.
+        today (date): Reference day for the current streak. Defaults to today.
+
+    Returns:
+        dict: ``run_starts``/``run_ends`` (day ordinal arrays, oldest run first) and
+        ``run_lengths``; ``current_streak``, the run ending today, or yesterday while today
+        has no contributions yet; ``longest_streak``; and ``gap_count``, ``longest_gap`` and
+        ``mean_gap``, the inactive days between runs.
+    """
+    today = (today or date.today()).toordinal()
+    active = series.ordinals[series.counts > 0].astype(np.int64)
+    if not len(active):
+        empty = np.empty(0, dtype=np.int64)
+        return {
+            "run_starts": empty, "run_ends": empty, "run_lengths": empty,
+            "current_streak": 0, "longest_streak": 0,
+            "gap_count": 0, "longest_gap": 0, "mean_gap": 0.0,
+        }
+
+    # Active days are sorted and unique, so a run continues exactly while ordinals step by 1
+    breaks = np.flatnonzero(np.diff(active) != 1) + 1
+    run_starts = active[np.r_[0, breaks]]
+    run_ends = active[np.r_[breaks - 1, len(active) - 1]]
+    run_lengths = run_ends - run_starts + 1
+    gaps = run_starts[1:] - run_ends[:-1] - 1
+
+    return {
+        "run_starts": run_starts,
+        "run_ends": run_ends,
+        "run_lengths": run_lengths,
+        "current_streak": int(run_lengths[-1]) if today - 1 <= run_ends[-1] <= today else 0,
+        "longest_streak": int(run_lengths.max()),
+        "gap_count": len(gaps),
+        "longest_gap": int(gaps.max()) if len(gaps) else 0,
+        "mean_gap": float(gaps.mean()) if len(gaps) else 0.0,
+    }
+
+
+class ContributionIndex:
+    """
+    Prefix sums over a series for constant-time range queries.
+
+    The series is spread over a dense calendar from its first to its last day so any
+    date maps straight to a position; days missing from the series count as not held.
+
+    Args:
+        series (ContributionSeries): Daily contribution counts.
+    """
+
+    def __init__(self, series: ContributionSeries):
+        self.first_day = int(series.ordinals[0]) if len(series) else 0
+        span = int(series.ordinals[-1]) - self.first_day + 1 if len(series) else 0
+        positions = series.ordinals.astype(np.int64) - self.first_day
+
+        counts = np.zeros(span, dtype=np.int64)
+        counts[positions] = series.counts
+        held = np.zeros(span, dtype=np.int64)
+        held[positions] = 1
+
+        self.counts = counts
+        self._total = np.r_[0, np.cumsum(counts)]
+        self._active = np.r_[0, np.cumsum(counts > 0)]
+        self._held = np.r_[0, np.cumsum(held)]
+
+    def _bounds(self, from_date: str = None, to_date: str = None) -> tuple:
+        span = len(self.counts)
+        start = 0 if from_date is None else date.fromisoformat(from_date).toordinal() - self.first_day
+        end = span if to_date is None else date.fromisoformat(to_date).toordinal() - self.first_day + 1
+        start, end = min(max(start, 0), span), min(max(end, 0), span)
+        return start, max(start, end)
+
+    def total(self, from_date: str = None, to_date: str = None) -> int:
+        """Contributions between ``from_date`` and ``to_date`` inclusive ('YYYY-MM-DD')."""
+        start, end = self._bounds(from_date, to_date)
+        return int(self._total[end] - self._total[start])
+
+    def active_days(self, from_date: str = None, to_date: str = None) -> int:
+        """Days with at least one contribution between ``from_date`` and ``to_date`` inclusive."""
+        start, end = self._bounds(from_date, to_date)
+        return int(self._active[end] - self._active[start])
+
+    def days(self, from_date: str = None, to_date: str = None) -> int:
+        """Days of the series between ``from_date`` and ``to_date`` inclusive."""
+        start, end = self._bounds(from_date, to_date)
+        return int(self._held[end] - self._held[start])
+
+    def rate(self, from_date: str = None, to_date: str = None) -> float:
+        """Contributions per day between ``from_date`` and ``to_date`` inclusive."""
+        days = self.days(from_date, to_date)
+        return self.total(from_date, to_date) / days if days else 0.0
+
+    def moving_average(self, window: int) -> np.ndarray:
+        """
+        Trailing ``window``-day average for every day of the calendar, oldest first.
+
+        The first ``window - 1`` days average over the days available so far, and days
+        missing from the series count as days without contributions.
+        """
+        ends = np.arange(1, len(self.counts) + 1)
+        starts = np.maximum(ends - window, 0)
+        return (self._total[ends] - self._total[starts]) / (ends - starts)
+
+    def moving_averages(self, windows=(7, 30, 90)) -> dict:
+        """Returns ``moving_average`` for each window, keyed by window length."""
+        return {window: self.moving_average(window) for window in windows}
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Days of the dense calendar as a ``datetime64[D]`` array."""
+        return (np.arange(len(self.counts)) + self.first_day - EPOCH_ORDINAL).astype("datetime64[D]")
+
+
+class ContributionCube(NamedTuple):
+    """
+    Contribution totals broken down by calendar unit, computed once per series.
+
+    Periods are listed oldest first and only include periods present in the series.
+    Weekday arrays start on Monday.
+    """
+    years: np.ndarray
+    year_totals: np.ndarray
+    months: np.ndarray
+    month_totals: np.ndarray
+    iso_years: np.ndarray
+    iso_weeks: np.ndarray
+    week_totals: np.ndarray
+    weekday_totals: np.ndarray
+    weekday_active_days: np.ndarray
+    weekend_totals: np.ndarray
+
+
+def _group_totals(keys: np.ndarray, counts: np.ndarray):
+    # Keys follow the sorted days, so each group is one contiguous block
+    starts = np.r_[0, np.flatnonzero(keys[1:] != keys[:-1]) + 1] if len(keys) else np.empty(0, dtype=np.int64)
+    totals = np.add.reduceat(counts, starts) if len(keys) else np.empty(0, dtype=np.int64)
+    return keys[starts], totals
+
+
+def aggregate_contributions(series: ContributionSeries) -> ContributionCube:
+    """
+    Computes the yearly, monthly, ISO-week, weekday and weekend breakdowns in one pass.
+
+    Args:
+        series (ContributionSeries): Daily contribution counts.
+
+    Returns:
+        ContributionCube: Totals per calendar unit.
+    """
+    counts = series.counts.astype(np.int64)
+    days = series.dates
+    # date.fromordinal(1) is a Monday
+    weekdays = (series.ordinals.astype(np.int64) - 1) % 7
+
+    years, year_totals = _group_totals(days.astype("datetime64[Y]").astype(np.int64) + 1970, counts)
+    months, month_totals = _group_totals(days.astype("datetime64[M]"), counts)
+
+    # An ISO week belongs to the year of its Thursday and is numbered from that year's first Thursday
+    thursdays = days + (3 - weekdays)
+    thursday_years = thursdays.astype("datetime64[Y]")
+    week_numbers = (thursdays - thursday_years.astype("datetime64[D]")).astype(np.int64) // 7 + 1
+    week_keys, week_totals = _group_totals((thursday_years.astype(np.int64) + 1970) * 100 + week_numbers, counts)
+
+    weekday_totals = np.bincount(weekdays, weights=counts, minlength=7).astype(np.int64)
+    return ContributionCube(
+        years=years,
+        year_totals=year_totals,
+        months=months,
+        month_totals=month_totals,
+        iso_years=week_keys // 100,
+        iso_weeks=week_keys % 100,
+        week_totals=week_totals,
+        weekday_totals=weekday_totals,
+        weekday_active_days=np.bincount(weekdays, weights=counts > 0, minlength=7).astype(np.int64),
+        weekend_totals=np.array([weekday_totals[:5].sum(), weekday_totals[5:].sum()]),
+    )
+
+
+# Rollup units: days, weeks starting on Sunday (as in GitHub's calendar) and months
+ROLLUP_UNITS = ("D", "W", "M")
+
+
+def rollup(series: ContributionSeries, unit: str = "D") -> tuple:
+    """
+    Totals contributions per day, week or month.
+
+    Args:
+        series (ContributionSeries): Daily contribution counts.
+        unit (str): ``"D"``, ``"W"`` (weeks starting on Sunday) or ``"M"``.
+
+    Returns:
+        tuple: ``(starts, totals)``; the first day of each period as ``datetime64[D]`` and its total.
+    """
+    counts = series.counts.astype(np.int64)
+    if unit == "D":
+        return series.dates, counts
+    if unit == "W":
+        # date.fromordinal(7) is a Sunday, so ordinal // 7 changes every Sunday
+        weeks, totals = _group_totals(series.ordinals.astype(np.int64) // 7, counts)
+        return (weeks * 7 - EPOCH_ORDINAL).astype("datetime64[D]"), totals
+    if unit == "M":
+        months, totals = _group_totals(series.dates.astype("datetime64[M]"), counts)
+        return months.astype("datetime64[D]"), totals
+    raise ValueError(f"Unknown rollup unit: {unit}")
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Picks at most ``threshold`` points that keep the shape of a line (Largest-Triangle-Three-Buckets).
+
+    The first and last points are always kept, and so is the highest point. Every other
+    bucket keeps the point forming the largest triangle with the previously kept point and
+    the next bucket's average, so picked values are real data points, never averages.
+
+    Args:
+        x (np.ndarray): Increasing x values.
+        y (np.ndarray): Values to plot.
+        threshold (int): Maximum number of points to keep.
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    # Interior points 1..n-2 are split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        average_x, average_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[previous] - average_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (average_y - y[previous]))
+        previous = start + int(area.argmax())
+        selected[bucket + 1] = previous
+
+    # Keep the highest point exactly, in place of its bucket's pick
+    peak = int(y.argmax())
+    if 0 < peak < n - 1:
+        selected[np.searchsorted(edges, peak, side="right")] = peak
+    return selected
+
+
+def downsample(starts: np.ndarray, totals: np.ndarray, max_points: int) -> tuple:
+    """
+    Reduces a rollup to at most ``max_points`` points with ``lttb_indices``.
+
+    Returns:
+        tuple: ``(starts, totals)`` of the kept points.
+    """
+    keep = lttb_indices(starts.astype(np.int64), totals, max_points)
+    return starts[keep], totals[keep]
+
+
+class SegmentSummary(NamedTuple):
+    """
+    Mergeable summary of a contiguous span of days.
+
+    ``prefix_run`` and ``suffix_run`` are the active runs touching the first and last day,
+    so two adjacent summaries can be merged in O(1) without the underlying days.
+    """
+    first_day: int
+    last_day: int
+    total: int
+    active_days: int
+    max_day: int
+    prefix_run: int
+    suffix_run: int
+    longest_run: int
+
+    @property
+    def length(self) -> int:
+        return self.last_day - self.first_day + 1
+
+    @property
+    def fully_active(self) -> bool:
+        return self.prefix_run == self.length
+
+
+def summarize_segment(series: ContributionSeries, first_day: str = None, last_day: str = None):
+    """
+    Summarises a calendar segment so it can later be merged with its neighbours.
+
+    Args:
+        series (ContributionSeries): Daily contribution counts of the segment.
+        first_day (str): First day the segment covers ('YYYY-MM-DD'). Defaults to the first day in the series.
+        last_day (str): Last day the segment covers ('YYYY-MM-DD'). Defaults to the last day in the series.
+
+    Returns:
+        SegmentSummary: The segment's summary, or None for an empty segment with no bounds.
+    """
+    if not len(series) and (first_day is None or last_day is None):
+        return None
+    first = date.fromisoformat(first_day).toordinal() if first_day else int(series.ordinals[0])
+    last = date.fromisoformat(last_day).toordinal() if last_day else int(series.ordinals[-1])
+    streaks = streak_stats(series)
+    starts, ends, lengths = streaks["run_starts"], streaks["run_ends"], streaks["run_lengths"]
+
+    return SegmentSummary(
+        first_day=first,
+        last_day=last,
+        total=int(series.counts.sum()),
+        active_days=int(np.count_nonzero(series.counts)),
+        max_day=int(series.counts.max()) if len(series) else 0,
+        prefix_run=int(lengths[0]) if len(starts) and starts[0] == first else 0,
+        suffix_run=int(lengths[-1]) if len(ends) and ends[-1] == last else 0,
+        longest_run=streaks["longest_streak"],
+    )
+
+
+def merge_segments(left: SegmentSummary, right: SegmentSummary):
+    """
+    Merges the summaries of two segments in O(1), ``left`` ending before ``right`` starts.
+
+    Runs join across the boundary when the segments are adjacent. Days between
+    non-adjacent segments count as inactive.
+
+    Args:
+        left (SegmentSummary): Earlier segment, or None.
+        right (SegmentSummary): Later segment, or None.
+
+    Returns:
+        SegmentSummary: Summary of the combined span.
+
+    Raises:
+        ValueError: If the segments overlap.
+    """
+    if left is None or right is None:
+        return left if right is None else right
+    if right.first_day <= left.last_day:
+        raise ValueError("Segments must be in order and must not overlap.")
+
+    adjacent = right.first_day == left.last_day + 1
+    joins = adjacent and left.suffix_run and right.prefix_run
+    return SegmentSummary(
+        first_day=left.first_day,
+        last_day=right.last_day,
+        total=left.total + right.total,
+        active_days=left.active_days + right.active_days,
+        max_day=max(left.max_day, right.max_day),
+        prefix_run=left.length + right.prefix_run if left.fully_active and adjacent else left.prefix_run,
+        suffix_run=right.length + left.suffix_run if right.fully_active and adjacent else right.suffix_run,
+        longest_run=max(left.longest_run, right.longest_run, left.suffix_run + right.prefix_run if joins else 0),
+    )
+
+
+def combine_segments(summaries) -> SegmentSummary:
+    """Merges consecutive segment summaries, oldest first, into one."""
+    return reduce(merge_segments, summaries, None)
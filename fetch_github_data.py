@@ -1,51 +1,149 @@
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+
 import requests
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import calendar_store
+from github_client import HIGH, LOW, GraphQLError, client
+from contribution_series import ContributionSeries
+from payloads import CALENDAR_TOTALS, compact_calendar, compact_repos, compact_response, compact_user, series_payload
+from util import parse_iso_datetime
+
+# Shared by every session; sized to the client's connection pool
+executor = ThreadPoolExecutor(max_workers=10, thread_name_prefix="github-fetch")
+
+# Repository pagination defaults; GitHub allows at most 100 nodes per page
+REPO_PAGE_SIZE = 100
+REPO_MAX_PAGES = 50
 
-BASE_URL = "https://api.github.com/graphql"
+# Cached payloads kept per fetcher; the oldest lookups are evicted first
+CACHE_MAX_ENTRIES = 64
+
+# Fields shared by every contributionsCollection selection in the combined overview query
+CALENDAR_FIELDS = """
+                restrictedContributionsCount
+                totalCommitContributions
+                totalPullRequestContributions
+                totalIssueContributions
+                contributionCalendar {
+                    totalContributions
+                    weeks {
+                        contributionDays {
+                            contributionCount
+                            date
+                        }
+                    }
+                }
+"""
 
-@st.cache_data(ttl=600)
-def fetch_data_for_duration(username: str, token: str, from_date: str, to_date: str):
+def run_query(query: str, token: str, priority: str = HIGH):
     """
-    Fetch user data from GitHub GraphQL API.
+    Run a GraphQL query through the shared GitHub client.
+
+    Failures are raised rather than returned, so the ``st.cache_data`` fetchers calling
+    this never cache them: an open circuit, an exhausted rate limit, a timeout or a
+    response holding GraphQL errors is asked again on the next call. Callers turn them
+    into error messages with ``future_result``.
 
     Args:
-        username (str): GitHub username.
+        query (str): GraphQL query string.
         token (str): GitHub personal access token.
+        priority (str): ``HIGH`` for queries a page cannot render without, ``LOW`` for
+            queries that can be delayed or shed when the rate-limit budget runs low.
 
     Returns:
-        dict: JSON response from GitHub API containing user data or error message.
+        dict: JSON response from GitHub API.
+
+    Raises:
+        requests.exceptions.RequestException: If the request failed after the client's retries.
+        GraphQLError: If GitHub answered with GraphQL errors.
     """
-    headers = {"Authorization": f"Bearer {token}"}
-    query = f"""
-    {{ 
-      user(login: "{username}") {{
-        createdAt
-        contributionsCollection(from: "{from_date}T00:00:00Z", to: "{to_date}T23:59:59Z") {{
-          restrictedContributionsCount
-          totalCommitContributions
-          totalPullRequestContributions
-          totalIssueContributions
-          contributionCalendar {{
-            totalContributions
-            weeks {{
-              contributionDays {{
-                contributionCount
-                date
-              }}
-            }}
-          }}
-        }}
-      }}
-    }}
+    response = client.post_query(query, token, priority)
+    if "errors" in response:
+        errors = response["errors"]
+        if isinstance(errors, list):
+            errors = "; ".join(error.get("message", str(error)) if isinstance(error, dict) else str(error) for error in errors)
+        raise GraphQLError(errors)
+    return response
+
+def submit_fetch(fetch, *args, **kwargs) -> Future:
+    """
+    Run a fetcher on the shared thread pool.
+
+    The calling script's run context is attached to the worker thread, so cached
+    fetchers keep their ``st.cache_data`` behaviour when called off the main thread.
+    The thread's previous context, if it had one, is restored afterwards with the same
+    public helper. Every task attaches its own caller's context, so a fetch never runs
+    under another session's.
+
+    Args:
+        fetch (callable): Fetch function to call, e.g. ``fetch_user_data``.
+        *args: Positional arguments for the fetcher.
+        **kwargs: Keyword arguments for the fetcher.
+
+    Returns:
+        Future: Future resolving to the fetcher's return value.
+    """
+    ctx = get_script_run_ctx()
+
+    def run():
+        thread = threading.current_thread()
+        previous = get_script_run_ctx(suppress_warning=True)
+        add_script_run_ctx(thread, ctx)
+        try:
+            return fetch(*args, **kwargs)
+        finally:
+            add_script_run_ctx(thread, previous)
+
+    return executor.submit(run)
+
+def future_result(future: Future) -> dict:
+    """
+    Result of a fetch future, waiting for it if needed, with an exception turned into an error message.
+
+    Done-callbacks and scripts read futures through this, so a fetch that raised still
+    resolves everything chained on it and reaches the page as the usual error.
     """
     try:
-        response = requests.post(BASE_URL, json={"query": query}, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return future.result()
+    except Exception as e:
         return {"errors": str(e)}
 
-@st.cache_data(ttl=600)    
+def fetch_concurrently(calls: dict) -> dict:
+    """
+    Start several independent fetches at once.
+
+    Args:
+        calls (dict): Maps a result name to a ``(fetch, *args)`` tuple.
+
+    Returns:
+        dict: Maps each result name to a Future for that fetch.
+    """
+    return {name: submit_fetch(fetch, *args) for name, (fetch, *args) in calls.items()}
+
+def rate_limit_summary(token: str):
+    """
+    Describe the token's remaining GraphQL rate-limit budget.
+
+    Args:
+        token (str): GitHub personal access token.
+
+    Returns:
+        str: Summary for display (e.g. "API budget: 4,870/5,000 points, resets in 42 min"),
+        or None before the token's first query.
+    """
+    budget = client.budget(token)
+    if budget is None:
+        return None
+    return (
+        f"API budget: {budget.remaining:,}/{budget.limit:,} points, "
+        f"resets in {budget.seconds_to_reset() / 60:.0f} min"
+    )
+
+@st.cache_data(ttl=600, max_entries=CACHE_MAX_ENTRIES)
 def fetch_user_data(username: str, token: str):
     """
     Fetch user data from GitHub GraphQL API.
@@ -55,9 +153,8 @@ def fetch_user_data(username: str, token: str):
         token (str): GitHub personal access token.
 
     Returns:
-        dict: JSON response from GitHub API containing user data or error message.
+        dict: Profile payload (see ``payloads.compact_user``) or error message.
     """
-    headers = {"Authorization": f"Bearer {token}"}
     query = f"""
     {{
         user(login: "{username}") {{
@@ -83,31 +180,32 @@ def fetch_user_data(username: str, token: str):
         }}
     }}
     """
-    try:
-        response = requests.post(BASE_URL, json={"query": query}, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        return {"errors": str(e)}
+    return compact_response(run_query(query, token), compact_user)
 
-@st.cache_data(ttl=600)
-def fetch_repo_data(username: str, token: str):
+@st.cache_data(ttl=600, max_entries=CACHE_MAX_ENTRIES)
+def fetch_repo_data(username: str, token: str, page_size: int = REPO_PAGE_SIZE, after: str = None):
     """
-    Fetch repository data from GitHub GraphQL API.
+    Fetch one page of repository data from GitHub GraphQL API.
 
     Args:
         username (str): GitHub username.
         token (str): GitHub personal access token.
+        page_size (int): Number of repositories per page (GitHub allows at most 100).
+        after (str): Cursor of the previous page's last repository, or None for the first page.
 
     Returns:
-        dict: JSON response from GitHub API containing repository data or error message.
+        dict: Repository page payload (see ``payloads.compact_repos``) or error message.
     """
-    headers = {"Authorization": f"Bearer {token}"}
+    after_clause = f', after: "{after}"' if after else ""
     query = f"""
     {{
         user(login: "{username}") {{
-            repositories(first: 100, ownerAffiliations: OWNER, isFork: false) {{
+            repositories(first: {page_size}{after_clause}, ownerAffiliations: OWNER, isFork: false) {{
                 totalCount
+                pageInfo {{
+                    hasNextPage
+                    endCursor
+                }}
                 edges {{
                     node {{
                         name
@@ -121,14 +219,39 @@ def fetch_repo_data(username: str, token: str):
         }}
     }}
     """
+    return compact_response(run_query(query, token), lambda user: compact_repos(user["repositories"]))
+
+def iter_repo_pages(username: str, token: str, page_size: int = REPO_PAGE_SIZE,
+                    max_pages: int = REPO_MAX_PAGES, first_page: dict = None):
+    """
+    Yield a user's repositories page by page, following ``pageInfo`` cursors.
+
+    Args:
+        username (str): GitHub username.
+        token (str): GitHub personal access token.
+        page_size (int): Number of repositories per page (GitHub allows at most 100).
+        max_pages (int): Maximum number of pages to yield.
+        first_page (dict): An already fetched first page (e.g. from ``fetch_overview_data``)
+            to continue from instead of fetching it again.
+
+    Yields:
+        dict: One ``fetch_repo_data`` payload per page. A page with an error message ends the iteration.
+    """
+    page = first_page if first_page is not None else fetch_repo_page(username, token, page_size)
+    for _ in range(max_pages):
+        yield page
+        if "errors" in page or not page["has_next_page"]:
+            return
+        page = fetch_repo_page(username, token, page_size, page["end_cursor"])
+
+def fetch_repo_page(username: str, token: str, page_size: int = REPO_PAGE_SIZE, after: str = None) -> dict:
+    """``fetch_repo_data`` with a failed request returned as an error message instead of raised."""
     try:
-        response = requests.post(BASE_URL, json={"query": query}, headers=headers)
-        response.raise_for_status()
-        return response.json()
+        return fetch_repo_data(username, token, page_size, after)
     except requests.exceptions.RequestException as e:
         return {"errors": str(e)}
 
-@st.cache_data(ttl=600)
+@st.cache_data(ttl=600, max_entries=CACHE_MAX_ENTRIES)
 def fetch_contribution_data(username: str, token: str):
     """
     Fetch contribution data from GitHub GraphQL API.
@@ -138,9 +261,8 @@ def fetch_contribution_data(username: str, token: str):
         token (str): GitHub personal access token.
 
     Returns:
-        dict: JSON response from GitHub API containing contribution data or error message.
+        dict: Compact calendar payload (see ``payloads.compact_calendar``) or error message.
     """
-    headers = {"Authorization": f"Bearer {token}"}
     query = f"""
     {{
         user(login: "{username}") {{
@@ -161,9 +283,305 @@ def fetch_contribution_data(username: str, token: str):
         }}
     }}
     """
+    return compact_response(run_query(query, token), lambda user: compact_calendar(user["contributionsCollection"]))
+
+@st.cache_data(ttl=600, max_entries=CACHE_MAX_ENTRIES)
+def fetch_overview_data(username: str, token: str):
+    """
+    Fetch profile, repository and contribution calendar data in a single GraphQL request.
+
+    Args:
+        username (str): GitHub username.
+        token (str): GitHub personal access token.
+
+    Returns:
+        dict: Payloads keyed by ``"user"``, ``"repos"`` and ``"contributions"``, or error message.
+    """
+    query = f"""
+    {{
+        user(login: "{username}") {{
+            name
+            bio
+            location
+            createdAt
+            avatarUrl
+            followers {{
+                totalCount
+            }}
+            following {{
+                totalCount
+            }}
+            repositories(first: {REPO_PAGE_SIZE}, ownerAffiliations: OWNER, isFork: false) {{
+                totalCount
+                pageInfo {{
+                    hasNextPage
+                    endCursor
+                }}
+                edges {{
+                    node {{
+                        name
+                        primaryLanguage {{
+                            name
+                            color
+                        }}
+                    }}
+                }}
+            }}
+            contributionsCollection {{
+                {CALENDAR_FIELDS}
+            }}
+        }}
+    }}
+    """
+    return compact_response(run_query(query, token), lambda user: {
+        "user": compact_user(user),
+        "repos": compact_repos(user["repositories"]),
+        "contributions": compact_calendar(user["contributionsCollection"]),
+    })
+
+def split_overview_data(data: dict):
+    """
+    Split a combined overview payload into the payloads returned by the individual fetchers.
+
+    Args:
+        data (dict): Payload from ``fetch_overview_data``.
+
+    Returns:
+        dict: Payloads keyed by ``"contributions"``, ``"user"`` and ``"repos"``.
+    """
+    keys = ("contributions", "user", "repos")
+    if "errors" in data:
+        return {key: data for key in keys}
+    return {key: data[key] for key in keys}
+
+def date_windows(from_date: date, to_date: date) -> list:
+    """
+    Split a date range into calendar-year windows.
+
+    GitHub caps a single ``contributionsCollection`` at one year, so longer ranges
+    have to be requested one window at a time.
+
+    Args:
+        from_date (date): First day of the range.
+        to_date (date): Last day of the range.
+
+    Returns:
+        list: ``(from_date, to_date)`` pairs of 'YYYY-MM-DD' strings, oldest first.
+    """
+    windows = []
+    for year in range(from_date.year, to_date.year + 1):
+        window_start = max(from_date, date(year, 1, 1))
+        window_end = min(to_date, date(year, 12, 31))
+        windows.append((window_start.isoformat(), window_end.isoformat()))
+    return windows
+
+def yearly_windows(created_at: str, until: date = None) -> list:
+    """
+    Split the span from account creation to today into calendar-year windows.
+
+    Args:
+        created_at (str): ISO creation timestamp (e.g., "2015-03-04T12:34:56Z").
+        until (date): Last day to include. Defaults to today.
+
+    Returns:
+        list: ``(from_date, to_date)`` pairs of 'YYYY-MM-DD' strings, oldest first.
+    """
+    start = parse_iso_datetime(created_at).date()
+    return date_windows(start, until or date.today())
+
+@st.cache_data(ttl=600, max_entries=CACHE_MAX_ENTRIES)
+def fetch_contribution_windows(username: str, token: str, windows: tuple, priority: str = LOW):
+    """
+    Fetch several contribution calendar windows in one request, one aliased field per window.
+
+    Args:
+        username (str): GitHub username.
+        token (str): GitHub personal access token.
+        windows (tuple): ``(from_date, to_date)`` pairs, each at most one year long.
+        priority (str): ``HIGH`` when a page's main sections need these windows, ``LOW`` for
+            optional extras that may be shed when the rate-limit budget runs low.
+
+    Returns:
+        dict: ``created_at`` and ``windows``, one compact calendar payload per window, or error message.
+    """
+    window_fields = "".join(
+        f"""
+            w{i}: contributionsCollection(from: "{from_date}T00:00:00Z", to: "{to_date}T23:59:59Z") {{
+                {CALENDAR_FIELDS}
+            }}"""
+        for i, (from_date, to_date) in enumerate(windows)
+    )
+    query = f"""
+    {{
+        user(login: "{username}") {{
+            createdAt{window_fields}
+        }}
+    }}
+    """
+    return compact_response(run_query(query, token, priority), lambda user: {
+        "created_at": user.get("createdAt"),
+        "windows": [compact_calendar(user[f"w{i}"]) for i in range(len(windows))],
+    })
+
+def stitch_calendars(calendars: list) -> dict:
+    """
+    Stitch consecutive calendar windows into one calendar payload.
+
+    Args:
+        calendars (list): Compact calendar payloads (see ``payloads.compact_calendar``), oldest first.
+
+    Returns:
+        dict: Calendar payload covering every window.
+    """
+    stitched = {key: sum(calendar[key] for calendar in calendars) for key in ("total_contributions", *CALENDAR_TOTALS)}
+    stitched["series"] = ContributionSeries.concat([calendar["series"] for calendar in calendars])
+    return stitched
+
+def submit_lifetime_fetch(username: str, token: str, created_at: str, batch_size: int = 4) -> Future:
+    """
+    Start fetching a user's full contribution history since ``created_at``.
+
+    The yearly windows are grouped into batches of aliased fields and all batches are
+    sent concurrently at high priority, since the history replaces the page's main
+    calendar. Nothing blocks while they run, so this is safe to call from a fetch callback.
+
+    Args:
+        username (str): GitHub username.
+        token (str): GitHub personal access token.
+        created_at (str): ISO creation timestamp of the account.
+        batch_size (int): Yearly windows requested per query.
+
+    Returns:
+        Future: Resolves to a calendar payload like ``fetch_contribution_data``'s or an error message.
+    """
+    windows = yearly_windows(created_at)
+    batches = [tuple(windows[i:i + batch_size]) for i in range(0, len(windows), batch_size)]
+    batch_futures = [submit_fetch(fetch_contribution_windows, username, token, batch, HIGH) for batch in batches]
+    result = Future()
+    lock = threading.Lock()
+    remaining = [len(batch_futures)]
+
+    def collect(_):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        calendars = []
+        for future in batch_futures:
+            data = future_result(future)
+            if "errors" in data:
+                result.set_result(data)
+                return
+            calendars.extend(data["windows"])
+        try:
+            result.set_result(stitch_calendars(calendars))
+        except Exception as e:
+            result.set_result({"errors": str(e)})
+
+    for future in batch_futures:
+        future.add_done_callback(collect)
+    return result
+
+def fetch_calendar_windows(username: str, token: str, windows: list, batch_size: int = 4, priority: str = HIGH) -> dict:
+    """
+    Fetch date windows (see ``date_windows``) in batches of aliased fields and stitch them together.
+
+    Returns:
+        dict: Calendar payload like ``stitch_calendars``'s, or error message.
+    """
+    calendars = []
+    for i in range(0, len(windows), batch_size):
+        data = fetch_contribution_windows(username, token, tuple(windows[i:i + batch_size]), priority)
+        if "errors" in data:
+            return data
+        calendars.extend(data["windows"])
+    return stitch_calendars(calendars)
+
+def sync_calendar(username: str, token: str, from_date: str, to_date: str, batch_size: int = 4, priority: str = HIGH):
+    """
+    Make sure the on-disk calendar store holds every day of a date range.
+
+    Only the sub-intervals the store does not hold yet for this user and token are
+    fetched, together with the recent days that are still inside the trailing window.
+    Read the days back with ``calendar_store.store.load_series``. When the store cannot
+    be read or written, the whole range is fetched directly and returned instead.
+
+    Args:
+        username (str): GitHub username.
+        token (str): GitHub personal access token.
+        from_date (str): First day of the range, in 'YYYY-MM-DD' format.
+        to_date (str): Last day of the range, in 'YYYY-MM-DD' format.
+        batch_size (int): Yearly windows requested per query.
+        priority (str): ``HIGH`` or ``LOW``, see ``fetch_contribution_windows``.
+
+    Returns:
+        dict: The ``missing`` intervals that were fetched into the store, the fetched
+        ``series`` when the store is unavailable, or error message.
+
+    Raises:
+        requests.exceptions.RequestException: If a request failed (see ``run_query``).
+    """
+    from_date = date.fromisoformat(from_date)
+    to_date = min(date.fromisoformat(to_date), date.today())
+
+    def fetch_directly(error):
+        print(f"Calendar store unavailable, fetching directly: {error}")
+        data = fetch_calendar_windows(username, token, date_windows(from_date, to_date), batch_size, priority)
+        return data if "errors" in data else {"series": data["series"]}
+
+    # Only store calls are guarded: failed requests are OSErrors too, and must not be retried here
     try:
-        response = requests.post(BASE_URL, json={"query": query}, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        return {"errors": str(e)}
+        held = calendar_store.store.held_intervals(username, token)
+    except (sqlite3.Error, OSError) as e:
+        return fetch_directly(e)
+    missing = calendar_store.missing_intervals(held, from_date, to_date)
+    windows = [window for first_day, last_day in missing for window in date_windows(first_day, last_day)]
+    data = fetch_calendar_windows(username, token, windows, batch_size, priority)
+    if "errors" in data:
+        return data
+
+    try:
+        for first_day, last_day in missing:
+            days = data["series"].between(first_day.isoformat(), last_day.isoformat()).items()
+            calendar_store.store.save_days(username, token, days, first_day, last_day)
+    except (sqlite3.Error, OSError) as e:
+        return fetch_directly(e)
+    return {"missing": [(first.isoformat(), last.isoformat()) for first, last in missing]}
+
+def submit_calendar_ranges(username: str, token: str, ranges: dict, priority: str = HIGH) -> dict:
+    """
+    Start one calendar store sync covering every requested range and read each range from it.
+
+    Days the store already holds (from earlier lookups or from ``fetch_contribution_data``
+    calendars saved with ``calendar_store.store.save_series``) are not downloaded again.
+
+    Args:
+        username (str): GitHub username.
+        token (str): GitHub personal access token.
+        ranges (dict): Maps a result name to a ``(from_date, to_date)`` pair of 'YYYY-MM-DD' strings.
+        priority (str): ``HIGH`` when the page cannot render without the ranges, ``LOW`` for optional ones.
+
+    Returns:
+        dict: Maps each result name to a Future resolving to a calendar payload (see
+        ``payloads.series_payload``) or error message.
+    """
+    from_date = min(from_date for from_date, _ in ranges.values())
+    to_date = max(to_date for _, to_date in ranges.values())
+    sync = submit_fetch(sync_calendar, username, token, from_date, to_date, priority=priority)
+    futures = {name: Future() for name in ranges}
+
+    def read(done):
+        state = future_result(done)
+        for name, (from_date, to_date) in ranges.items():
+            if "errors" in state:
+                futures[name].set_result(state)
+            elif "series" in state:
+                futures[name].set_result(series_payload(state["series"].between(from_date, to_date)))
+            else:
+                try:
+                    futures[name].set_result(series_payload(calendar_store.store.load_series(username, token, from_date, to_date)))
+                except (sqlite3.Error, OSError) as e:
+                    futures[name].set_result({"errors": f"Calendar store unavailable: {e}"})
+
+    sync.add_done_callback(read)
+    return futures
@@ -0,0 +1,154 @@
+from datetime import date
+from typing import NamedTuple
+
+import numpy as np
+
+from contribution_series import EPOCH_ORDINAL, ContributionSeries
+
+# Days of history the daily model is fitted on
+LOOKBACK_DAYS = 365
+
+# Weekdays with fewer active days than this draw their counts from every active day instead
+MIN_WEEKDAY_SAMPLES = 8
+
+# How far ahead milestone dates are simulated
+MILESTONE_HORIZON_DAYS = 730
+
+# Slots in each weekday's lookup table; probabilities are rounded to multiples of 1/RESOLUTION
+RESOLUTION = 4096
+
+SIMULATIONS = 20000
+BATCH_SIZE = 2000
+PERCENTILES = (10, 50, 90)
+
+
+class DailyModel(NamedTuple):
+    """
+    Zero-inflated model of daily contribution counts with weekday effects.
+
+    Each weekday (Monday first) has its own chance of being active, and the count on an
+    active day follows the observed counts of active days on that weekday. Row ``w`` of
+    ``table`` is that weekday's inverse CDF: a uniformly drawn slot gives a day's count.
+    """
+    active_probability: np.ndarray
+    table: np.ndarray
+
+
+def fit_daily_model(series: ContributionSeries, lookback_days: int = LOOKBACK_DAYS) -> DailyModel:
+    """
+    Fits the daily count distribution from the last ``lookback_days`` of a calendar.
+
+    Args:
+        series (ContributionSeries): Daily contribution counts.
+        lookback_days (int): Number of most recent days to fit on.
+
+    Returns:
+        DailyModel: The fitted model.
+    """
+    recent_days = series.ordinals[-lookback_days:].astype(np.int64)
+    recent_counts = series.counts[-lookback_days:].astype(np.int64)
+    # date.fromordinal(1) is a Monday
+    weekdays = (recent_days - 1) % 7
+    active = recent_counts > 0
+
+    observed_days = np.bincount(weekdays, minlength=7)
+    active_days = np.bincount(weekdays[active], minlength=7)
+    active_probability = np.divide(active_days, observed_days, out=np.zeros(7), where=observed_days > 0)
+
+    table = np.zeros((7, RESOLUTION), dtype=np.int32)
+    for weekday in range(7):
+        # Sparse weekdays borrow the counts of every active day
+        sample = recent_counts[active & (weekdays == weekday)] if active_days[weekday] >= MIN_WEEKDAY_SAMPLES else recent_counts[active]
+        if not len(sample):
+            continue
+        values, frequency = np.unique(sample, return_counts=True)
+        probability = np.r_[1 - active_probability[weekday], active_probability[weekday] * frequency / len(sample)]
+        slots = np.diff(np.r_[0, np.rint(np.cumsum(probability) * RESOLUTION)]).astype(np.int64)
+        table[weekday] = np.repeat(np.r_[0, values], slots)[:RESOLUTION]
+
+    return DailyModel(active_probability=active_probability, table=table)
+
+
+def simulate_counts(model: DailyModel, first_day: int, horizon: int, simulations: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Draws ``simulations`` independent paths of daily counts.
+
+    Args:
+        model (DailyModel): Fitted daily model.
+        first_day (int): Ordinal of the first simulated day.
+        horizon (int): Number of days per path.
+        simulations (int): Number of paths.
+        rng (np.random.Generator): Source of randomness.
+
+    Returns:
+        np.ndarray: ``(simulations, horizon)`` array of daily counts.
+    """
+    weekdays = (np.arange(first_day, first_day + horizon) - 1) % 7
+    # One integer draw per day picks a slot in that weekday's row of the flattened table
+    slots = rng.integers(0, RESOLUTION, (simulations, horizon), dtype=np.int32)
+    slots += (weekdays * RESOLUTION).astype(np.int32)
+    return model.table.ravel()[slots]
+
+
+def forecast_year(series: ContributionSeries, total_contributions: int, active_days: int, milestones=(),
+                  today: date = None, simulations: int = SIMULATIONS, percentiles=PERCENTILES, seed: int = None) -> dict:
+    """
+    Forecasts the rest of the year and future milestones with Monte Carlo simulation.
+
+    Simulation starts the day after ``today``, which is counted as already observed.
+
+    Args:
+        series (ContributionSeries): Daily contribution counts the model is fitted on.
+        total_contributions (int): Contributions so far this year.
+        active_days (int): Active days so far this year.
+        milestones (iterable): Contribution targets counted against ``total_contributions``.
+        today (date): Last observed day. Defaults to today.
+        simulations (int): Number of simulated paths.
+        percentiles (tuple): Percentiles to report, e.g. ``(10, 50, 90)``.
+        seed (int): Random seed. Defaults to one derived from the calendar, so the same data
+            always gives the same forecast.
+
+    Returns:
+        dict: ``year_end_total`` and ``year_end_active_days``, one value per percentile;
+        ``milestone_dates``, per milestone not reached yet a ``datetime64[D]`` array with one date
+        per percentile (NaT where it is not reached within ``MILESTONE_HORIZON_DAYS``); and
+        ``milestone_odds``, per milestone not reached yet the share of simulations reaching it
+        by the end of the year.
+    """
+    today = today or date.today()
+    first_day = today.toordinal() + 1
+    days_left = date(today.year, 12, 31).toordinal() - today.toordinal()
+    targets = {milestone: milestone - total_contributions for milestone in milestones if milestone > total_contributions}
+    horizon = max(days_left, MILESTONE_HORIZON_DAYS if targets else 0, 1)
+
+    model = fit_daily_model(series)
+    rng = np.random.default_rng(int(series.digest()[:16], 16) if seed is None else seed)
+
+    year_end_totals = []
+    year_end_active = []
+    crossings = {milestone: [] for milestone in targets}
+    for start in range(0, simulations, BATCH_SIZE):
+        counts = simulate_counts(model, first_day, horizon, min(BATCH_SIZE, simulations - start), rng)
+        cumulative = np.cumsum(counts, axis=1, dtype=np.int32)
+        year_end_totals.append(cumulative[:, days_left - 1] if days_left else np.zeros(len(counts), dtype=np.int32))
+        year_end_active.append(np.count_nonzero(counts[:, :days_left], axis=1))
+        for milestone, remaining in targets.items():
+            # Paths only grow, so the days still short of the target give the crossing day
+            crossings[milestone].append(np.count_nonzero(cumulative < remaining, axis=1))
+
+    milestone_dates = {}
+    milestone_odds = {}
+    for milestone in targets:
+        crossing = np.concatenate(crossings[milestone])
+        days = np.percentile(crossing, percentiles, method="lower")
+        dates = (first_day + days - EPOCH_ORDINAL).astype("datetime64[D]")
+        dates[days >= horizon] = np.datetime64("NaT")
+        milestone_dates[milestone] = dates
+        milestone_odds[milestone] = float(np.mean(crossing < days_left))
+
+    return {
+        "year_end_total": total_contributions + np.percentile(np.concatenate(year_end_totals), percentiles, method="nearest"),
+        "year_end_active_days": active_days + np.percentile(np.concatenate(year_end_active), percentiles, method="nearest"),
+        "milestone_dates": milestone_dates,
+        "milestone_odds": milestone_odds,
+    }
@@ -0,0 +1,321 @@
+import copy
+import hashlib
+import random
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = "https://api.github.com/graphql"
+
+# Statuses GitHub uses for transient failures and (secondary) rate limiting
+RETRY_STATUSES = {500, 502, 503, 504}
+RATE_LIMIT_STATUSES = {403, 429}
+
+# Request priorities; low-priority queries are delayed or shed first when the budget runs low
+HIGH = "high"
+LOW = "low"
+
+# Points of the hourly GraphQL budget kept back for high-priority queries
+LOW_PRIORITY_RESERVE = 500
+
+# Longest we are willing to hold a query back waiting for the budget to reset
+MAX_RATE_LIMIT_WAIT = 5
+
+# Longest ``Retry-After`` we wait out before retrying; longer ones give up instead
+MAX_RETRY_AFTER = 60
+
+RATE_LIMIT_FIELD = "rateLimit { cost remaining limit resetAt }"
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised when the circuit breaker is open and GitHub is not being called."""
+
+
+class RateLimitExceededError(requests.exceptions.RequestException):
+    """Raised when a query is shed because the token's rate-limit budget is too low."""
+
+
+class GraphQLError(requests.exceptions.RequestException):
+    """Raised when GitHub answers a query with GraphQL errors, such as a timed out or rate-limited query."""
+
+
+class RateLimitBudget:
+    """
+    Rate-limit budget of one token, as last reported by GitHub.
+
+    Args:
+        remaining (int): Points left in the current window.
+        limit (int): Points per window.
+        reset_at (float): Unix time at which the window resets.
+        last_cost (int): Cost of the most recent query.
+        spent (int): Total cost of queries recorded by this process.
+    """
+
+    def __init__(self, remaining: int, limit: int, reset_at: float, last_cost: int = 0, spent: int = 0):
+        self.remaining = remaining
+        self.limit = limit
+        self.reset_at = reset_at
+        self.last_cost = last_cost
+        self.spent = spent
+
+    def seconds_to_reset(self) -> float:
+        return max(0.0, self.reset_at - time.time())
+
+
+def token_key(token: str) -> str:
+    """Short SHA-256 digest identifying a token wherever results are kept per token."""
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def with_rate_limit(query: str) -> str:
+    """Adds the ``rateLimit`` field to the top level of a query so its cost is reported."""
+    start = query.index("{") + 1
+    return f"{query[:start]} {RATE_LIMIT_FIELD}{query[start:]}"
+
+
+class GitHubClient:
+    """
+    Shared HTTP client for the GitHub GraphQL API.
+
+    Keeps a pooled keep-alive session, applies connect/read timeouts to every call,
+    retries 5xx responses with jittered exponential backoff and secondary-rate-limit
+    responses after their ``Retry-After``, fails fast once the primary quota is used up
+    and opens a circuit breaker after repeated failures. While half-open, the breaker
+    lets a single trial call through. Every query also reports its
+    ``rateLimit`` cost, which is tracked per token to schedule later queries. Identical
+    queries sent with the same token while one is already in flight wait for that
+    request instead of sending their own.
+
+    Args:
+        base_url (str): GraphQL endpoint to post queries to.
+        connect_timeout (float): Seconds to wait for a connection.
+        read_timeout (float): Seconds to wait for a response.
+        max_retries (int): Retries after the first attempt for retryable failures.
+        backoff_base (float): Base delay in seconds for exponential backoff.
+        backoff_cap (float): Upper bound in seconds for a single backoff delay.
+        failure_threshold (int): Consecutive failed calls that open the circuit.
+        reset_timeout (float): Seconds the circuit stays open before a trial call.
+        pool_size (int): Number of keep-alive connections kept in the pool.
+    """
+
+    def __init__(self, base_url: str = BASE_URL, connect_timeout: float = 5, read_timeout: float = 30,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_cap: float = 8,
+                 failure_threshold: int = 5, reset_timeout: float = 30, pool_size: int = 10):
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._budgets = {}
+        self._in_flight = {}
+
+    def post_query(self, query: str, token: str, priority: str = HIGH) -> dict:
+        """
+        Post a GraphQL query and return the decoded JSON response.
+
+        The query's ``rateLimit`` cost is recorded against the token's budget. When the
+        budget runs low, low-priority queries are held until the window resets (if that
+        is soon) or shed; high-priority queries are only held back once it is exhausted.
+
+        Args:
+            query (str): GraphQL query string.
+            token (str): GitHub personal access token.
+            priority (str): ``HIGH`` or ``LOW``.
+
+        Returns:
+            dict: JSON response from GitHub API.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            RateLimitExceededError: If the query was shed to protect the budget, the quota is used
+                up or GitHub asks to wait longer than ``MAX_RETRY_AFTER``.
+            requests.exceptions.RequestException: If the request still fails after retries.
+        """
+        key = (self._token_key(token), query)
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            leader = in_flight is None
+            if leader:
+                in_flight = self._in_flight[key] = Future()
+
+        if not leader:
+            # Callers may mutate their response, so followers get their own copy
+            return copy.deepcopy(in_flight.result())
+
+        try:
+            data = self._send(query, token, priority)
+        except BaseException as e:
+            in_flight.set_exception(e)
+            raise
+        else:
+            in_flight.set_result(data)
+            return data
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def _send(self, query: str, token: str, priority: str) -> dict:
+        probe = self._before_call()
+        try:
+            self._schedule(token, priority)
+            data = self._post(with_rate_limit(query), token)
+        finally:
+            if probe:
+                # A trial that ended without a verdict (e.g. shed) lets the next call try instead
+                with self._lock:
+                    self._probing = False
+        self._record_cost(token, (data.get("data") or {}).pop("rateLimit", None))
+        return data
+
+    def budget(self, token: str):
+        """
+        Returns:
+            RateLimitBudget: The token's last known budget, or None before its first query.
+        """
+        with self._lock:
+            return self._budgets.get(self._token_key(token))
+
+    @staticmethod
+    def _token_key(token: str) -> str:
+        return token_key(token)
+
+    def _schedule(self, token: str, priority: str):
+        budget = self.budget(token)
+        if budget is None or budget.seconds_to_reset() == 0:
+            return
+        reserve = LOW_PRIORITY_RESERVE if priority == LOW else 0
+        if budget.remaining - max(budget.last_cost, 1) >= reserve:
+            return
+        if budget.seconds_to_reset() <= MAX_RATE_LIMIT_WAIT:
+            time.sleep(budget.seconds_to_reset())
+            return
+        raise RateLimitExceededError(
+            f"GitHub API rate limit nearly used up ({budget.remaining} points left); "
+            f"try again in {budget.seconds_to_reset() / 60:.0f} minutes."
+        )
+
+    def _record_cost(self, token: str, rate_limit: dict):
+        if not rate_limit:
+            return
+        reset_at = datetime.strptime(rate_limit["resetAt"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).timestamp()
+        key = self._token_key(token)
+        with self._lock:
+            previous = self._budgets.get(key)
+            self._budgets[key] = RateLimitBudget(
+                remaining=rate_limit["remaining"],
+                limit=rate_limit["limit"],
+                reset_at=reset_at,
+                last_cost=rate_limit["cost"],
+                spent=(previous.spent if previous else 0) + rate_limit["cost"],
+            )
+
+    def _post(self, query: str, token: str) -> dict:
+        headers = {"Authorization": f"Bearer {token}"}
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(self.base_url, json={"query": query}, headers=headers, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    self._record_failure()
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            if self._is_primary_rate_limit(response):
+                # Retrying cannot help before the quota resets
+                raise RateLimitExceededError(
+                    f"GitHub API rate limit exceeded; try again in {self._seconds_to_quota_reset(response) / 60:.0f} minutes."
+                )
+
+            if self._should_retry(response):
+                if attempt >= self.max_retries:
+                    self._record_failure()
+                    response.raise_for_status()
+                time.sleep(self._backoff(attempt, response))
+                attempt += 1
+                continue
+
+            # Client errors such as a bad token say nothing about GitHub's health
+            self._record_success()
+            response.raise_for_status()
+            return response.json()
+
+    @staticmethod
+    def _is_primary_rate_limit(response: requests.Response) -> bool:
+        return (response.status_code in RATE_LIMIT_STATUSES and "Retry-After" not in response.headers
+                and response.headers.get("X-RateLimit-Remaining") == "0")
+
+    @staticmethod
+    def _seconds_to_quota_reset(response: requests.Response) -> float:
+        reset_at = response.headers.get("X-RateLimit-Reset", "")
+        return max(0.0, float(reset_at) - time.time()) if reset_at.isdigit() else 0.0
+
+    @staticmethod
+    def _is_secondary_rate_limit(response: requests.Response) -> bool:
+        if response.status_code not in RATE_LIMIT_STATUSES:
+            return False
+        return "Retry-After" in response.headers or "secondary rate limit" in response.text.lower()
+
+    def _should_retry(self, response: requests.Response) -> bool:
+        return response.status_code in RETRY_STATUSES or self._is_secondary_rate_limit(response)
+
+    def _backoff(self, attempt: int, response: requests.Response = None) -> float:
+        """
+        Full-jitter exponential backoff, or GitHub's ``Retry-After`` in full when it sends one.
+
+        Raises:
+            RateLimitExceededError: If ``Retry-After`` is longer than ``MAX_RETRY_AFTER``.
+        """
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            retry_after = float(response.headers["Retry-After"])
+            if retry_after > MAX_RETRY_AFTER:
+                raise RateLimitExceededError(f"GitHub API secondary rate limit hit; try again in {retry_after:.0f} seconds.")
+            return retry_after
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _before_call(self) -> bool:
+        """Returns True when this call is the half-open trial."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError("GitHub API is unavailable, please try again shortly.")
+            # Half-open: let this call through as the only trial; one more failure re-opens
+            self._probing = True
+            self._failures = self.failure_threshold - 1
+            return True
+
+    def _record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+    def _record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+
+# Shared by every fetcher in the process so connections are reused across sessions
+client = GitHubClient()
@@ -1,8 +1,15 @@
+import time
+SCRIPT_STARTED = time.perf_counter()
+
 import streamlit as st
+import numpy as np
 from datetime import datetime
-from fetch_github_data import fetch_data_for_duration
-from process_github_data import analyze_contributions
-from util import predict_days_to_milestone, get_milestone_dates, format_date_ddmmyyyy
+from fetch_github_data import future_result, rate_limit_summary, submit_calendar_ranges
+from forecast import PERCENTILES, SIMULATIONS, forecast_year
+from session_store import get_report, keep_sidebar_inputs, predictions_failed, report_key, share_predictions
+from util import DEFAULT_MILESTONES, SHOW_TIMINGS, parse_milestones, predict_days_to_milestone, find_milestone_dates, format_dates_ddmmyyyy, record_timing, timing_summary
+
+record_timing("predictions imports", SCRIPT_STARTED)
 
 st.set_page_config(
     page_title = "GitHub Stat Checker",
@@ -20,17 +27,21 @@ st.set_page_config(
 )
 # Title and input
 st.title("GitHub Contribution Tracker")
+keep_sidebar_inputs()
 with st.sidebar:
     form = st.container(border=True)
-    username = form.text_input("Enter GitHub Username:")
-    token = form.text_input("Enter GitHub Personal Access Token:", type="password", help="Help: [Create Personal Access Token](https://docs.github.com/en/authentication/keeping-your-account-and-data-secure/managing-your-personal-access-tokens#creating-a-personal-access-token-classic)")
-    show_private = form.toggle("Show Private Contributions", value=True, help="Toggle to show/hide private contributions in stats. Requires a token with 'repo' scope.")
+    username = form.text_input("Enter GitHub Username:", key="username")
+    token = form.text_input("Enter GitHub Personal Access Token:", type="password", key="token", help="Help: [Create Personal Access Token](https://docs.github.com/en/authentication/keeping-your-account-and-data-secure/managing-your-personal-access-tokens#creating-a-personal-access-token-classic)")
+    show_private = form.toggle("Show Private Contributions", key="show_private", help="Toggle to show/hide private contributions in stats. Requires a token with 'repo' scope.")
+    milestone_input = form.text_input("Milestones:", key="milestones", help="Comma separated contribution targets, e.g. 100, 500, 1k.")
     
     # Add warning about token permissions if showing private contributions
     if show_private:
         form.info("To view private contributions, make sure your token has the 'repo' scope enabled.", icon="ℹ️")
     
     button_pressed = form.button("Track", type="primary")
+    budget_slot = st.empty()
+    timings_slot = st.empty()
 
     with st.container(border=True):
         st.page_link(
@@ -47,34 +58,31 @@ with st.sidebar:
             )
 
 
-if username and token and button_pressed:
-    # Fetch data
-    today = datetime.now().strftime("%Y-%m-%d")
-    current_year = datetime.now().year
-    current_jan1st = datetime(current_year, 1, 1).strftime("%Y-%m-%d")
-    last_jan1st = datetime(current_year-1, 1, 1).strftime("%Y-%m-%d")
-    last_dedc31st = datetime(current_year-1, 12, 31).strftime("%Y-%m-%d")
+today = datetime.now().strftime("%Y-%m-%d")
+last_jan1st = datetime(datetime.now().year-1, 1, 1).strftime("%Y-%m-%d")
 
-    year_data = fetch_data_for_duration(
-        username, 
-        token,
-        from_date= last_jan1st,
-        to_date= last_dedc31st
-        )
+# Shared with the overview, which saves this report (and prepares it in the background) as soon
+# as it has both years; toggles and milestones only change what is shown
+key = report_key(username, token) if username and token else None
+report = get_report(key) if key else None
+if key and button_pressed and predictions_failed(report):
+    # Fetch data; one range covers both years and every statistic below is a local query over it
+    history_data = future_result(submit_calendar_ranges(username, token, {"history": (last_jan1st, today)})["history"])
+    report = share_predictions(username, token, history_data)
 
-    current_year_data = fetch_data_for_duration(
-        username, 
-        token,
-        from_date= current_jan1st,
-        to_date= today
-        )
-    
+if report is not None:
     # Process data
-    whole_year_stats = analyze_contributions(year_data)
-    current_year_stats = analyze_contributions(current_year_data)
+    prepared = future_result(report["prepared"])
+    if "errors" in prepared:
+        st.error("Error fetching data. Check your username/token.")
+        st.stop()
+
+    history = prepared["history"]
+    index = prepared["index"]
+    current_year_series = prepared["current_year_series"]
+    whole_year_stats = prepared["whole_year_stats"]
+    current_year_stats = prepared["current_year_stats"]
 
-    
-    
     with st.container(border=True):
         # --- 365 days stats ---
         contribution_rate_ly = whole_year_stats.get('contribution_rate', 0)
@@ -97,9 +105,21 @@ if username and token and button_pressed:
     # else:
     #     active_days_growth = ((active_days - active_days_ly) / active_days_ly) * 100  # Growth in %
 
-    remaining_days = 365 - total_days
-    predicted_future_contributions = contribution_rate * remaining_days
-    predicted_future_active_days = (active_days / total_days) * remaining_days
+    # Milestone goals
+    milestones = parse_milestones(milestone_input)
+    if not milestones:
+        st.warning("Could not read the milestones, showing the default ones instead.")
+        milestones = DEFAULT_MILESTONES
+
+    # Simulate the rest of the year from the daily pattern of the last 12 months, once per set of milestones
+    if tuple(milestones) not in prepared["forecasts"]:
+        prepared["forecasts"][tuple(milestones)] = forecast_year(history, total_contributions, active_days, milestones)
+    forecast = prepared["forecasts"][tuple(milestones)]
+    low_total, median_total, high_total = forecast["year_end_total"]
+    low_active, median_active, high_active = forecast["year_end_active_days"]
+    predicted_future_contributions = median_total - total_contributions
+    predicted_future_active_days = median_active - active_days
+    band = PERCENTILES[-1] - PERCENTILES[0]
 
 
     with st.container():
@@ -118,23 +138,31 @@ if username and token and button_pressed:
 
         col2.metric(
             label="Predicted Contributions This Year",
-            value=f"{predicted_future_contributions + total_contributions:.0f} commits",
+            value=f"{median_total:.0f} commits",
             delta=f"{'-' if predicted_future_contributions<=0 else '+'}{predicted_future_contributions:.0f} commits",
-            help="Total predicted commits this year, if user continues to contribute at the same rate",
+            help=f"Median of {SIMULATIONS:,} simulations of the rest of the year based on the last 12 months. {band}% of them end between {low_total} and {high_total} commits.",
             border=True
         )
 
         col3.metric(
             label="Predicted Active Days This Year",
-            value=f"{predicted_future_active_days + active_days:.0f} days",
+            value=f"{median_active:.0f} days",
             delta=f"{'-' if predicted_future_active_days <= 0 else '+'} {predicted_future_active_days:.0f} days",
             delta_color="off" if predicted_future_active_days <= 0 else "normal",
-            help="Total predicted active days this year, if user continues to contribute at the same rate",
+            help=f"Median of {SIMULATIONS:,} simulations of the rest of the year based on the last 12 months. {band}% of them end between {low_active} and {high_active} active days.",
             border=True
         )
 
-    # Milestone goals
-    milestones = [100, 500, 1000, 2000, 5000, 10000]
+        st.caption(f"{band}% range by 31st Dec: {low_total}–{high_total} commits, {low_active}–{high_active} active days")
+
+        # Trailing averages come from the same prefix sums
+        if len(index.counts):
+            recent_pace = ", ".join(
+                f"{average[-1]:.2f}/day over the last {window} days"
+                for window, average in index.moving_averages().items()
+            )
+            st.caption(f"Recent pace: {recent_pace}")
+
     with st.container():
         st.markdown("#### :material/done_all: Milestones Estimations")
         
@@ -149,9 +177,16 @@ if username and token and button_pressed:
             for milestone in milestones
         }
 
-        contributions = current_year_data["data"]["user"]["contributionsCollection"]["contributionCalendar"]["weeks"]
+        estimated_dates, _ = find_milestone_dates(milestones, current_year_series, total_contributions, contribution_rate)
 
-        milestone_dates = get_milestone_dates(milestones, contributions, total_contributions, contribution_rate)
+        # Every date the cards show, formatted in one pass: the estimate, then the simulated
+        # low, median and high date of each milestone (NaT, shown empty, where there is none)
+        no_dates = np.full(3, np.datetime64("NaT"), dtype="datetime64[D]")
+        shown_dates = np.array([
+            [estimated, *forecast["milestone_dates"].get(milestone, no_dates)]
+            for milestone, estimated in zip(milestones, estimated_dates)
+        ], dtype="datetime64[D]")
+        date_labels = format_dates_ddmmyyyy(shown_dates.ravel()).reshape(shown_dates.shape)
 
 
         # Display Milestones
@@ -163,10 +198,7 @@ if username and token and button_pressed:
             col = col1 if i % 2 == 0 else col2  # Alternate between columns
             if total_contributions >= milestone:
                 # Unlocked Milestone
-                status = milestone_dates.get(milestone, 'Not Achieveable')
-                date = ''
-                if status != 'Not Achieveable':
-                    date = format_date_ddmmyyyy(status)
+                date = date_labels[i, 0]
                 col.metric(
                     label=f"✅ Achieved Milestone: {milestone} commits",
                     value=f"{date}" if date else "Achieved",
@@ -180,21 +212,35 @@ if username and token and button_pressed:
             else:
                 progress = min(100, (total_contributions / milestone) * 100)
                 # Locked Milestone with Progress Bar
-                status = milestone_dates.get(milestone, 'Not Achieveable')
-                date = ''
-                if status != 'Not Achieveable':
-                    date = format_date_ddmmyyyy(status)
+                _, low_date, median_date, high_date = shown_dates[i]
+                date = date_labels[i, 0]
+                if not np.isnat(median_date):
+                    # Simulated median, falling back to the linear estimate beyond the simulated horizon
+                    date = date_labels[i, 2]
+                    days = (median_date - np.datetime64(today)).astype(int)
                 col.metric(
                     label=f"Estimated days to {milestone} commits",
                     value=f"{date}" if date else "Not achievable",
                     delta=f"{days:.0f} days" if days != float('inf') else "Not achievable"
                 )
+                if not np.isnat(high_date):
+                    col.caption(
+                        f"{band}% likely between {date_labels[i, 1]} and {date_labels[i, 3]}, "
+                        f"{forecast['milestone_odds'][milestone]:.0%} chance this year"
+                    )
 
                 if progress > 0:
                     col.progress(progress / 100, text=f":blue[{total_contributions}/{milestone}]")
                     col.divider()
 
+    record_timing("predictions render", SCRIPT_STARTED)
+
 
 
 else:
-    st.info("ℹ️ ***Enter your GitHub username and token in the sidebar to get started.***")
\ No newline at end of file
+    st.info("ℹ️ ***Enter your GitHub username and token in the sidebar to get started.***")
+
+if username and token and rate_limit_summary(token):
+    budget_slot.caption(rate_limit_summary(token))
+if SHOW_TIMINGS:
+    timings_slot.caption(f"Timings: {timing_summary()}")
@@ -0,0 +1,114 @@
+from contribution_series import ContributionSeries
+
+# Calendar totals kept next to the daily counts, keyed by their GraphQL field names
+CALENDAR_TOTALS = {
+    "restricted_contributions": "restrictedContributionsCount",
+    "total_commits": "totalCommitContributions",
+    "total_pullrequests": "totalPullRequestContributions",
+    "total_issues": "totalIssueContributions",
+}
+
+
+def compact_response(data: dict, compact) -> dict:
+    """
+    Turns a GraphQL response into a compact payload before it is cached.
+
+    Args:
+        data (dict): JSON response from GitHub API or error message.
+        compact (callable): Builds the payload from the response's ``user`` object.
+
+    Returns:
+        dict: The compact payload, or error message.
+    """
+    if "errors" in data:
+        return data
+    try:
+        user = data["data"]["user"]
+        if user is None:
+            return {"errors": "User not found."}
+        return compact(user)
+    except (KeyError, TypeError) as e:
+        return {"errors": f"Unexpected response: {e}"}
+
+
+def compact_calendar(collection: dict) -> dict:
+    """
+    Compacts a ``contributionsCollection`` into its totals and a ``ContributionSeries``.
+
+    Args:
+        collection (dict): ``contributionsCollection`` object from a GraphQL response.
+
+    Returns:
+        dict: ``total_contributions`` (public), the ``CALENDAR_TOTALS`` counts and ``series``.
+    """
+    calendar = collection["contributionCalendar"]
+    days = [day for week in calendar["weeks"] for day in week["contributionDays"]]
+    payload = {key: collection.get(field) or 0 for key, field in CALENDAR_TOTALS.items()}
+    payload["total_contributions"] = calendar.get("totalContributions") or 0
+    payload["series"] = ContributionSeries.from_days([day["date"] for day in days], [day["contributionCount"] for day in days])
+    return payload
+
+
+def series_payload(series: ContributionSeries) -> dict:
+    """
+    Wraps stored daily counts as a calendar payload.
+
+    Restricted (private) contributions and the per-type totals are not per-day data,
+    so they are reported as 0.
+    """
+    payload = dict.fromkeys(CALENDAR_TOTALS, 0)
+    payload["total_contributions"] = int(series.counts.sum())
+    payload["series"] = series
+    return payload
+
+
+def compact_user(user: dict) -> dict:
+    """
+    Flattens a GraphQL ``user`` object into the profile fields the app displays.
+
+    Returns:
+        dict: Name, bio, location, ``created_at``, ``avatar_url`` and the follower,
+        repository and contribution counts.
+    """
+    contributions = user.get("contributionsCollection") or {}
+    return {
+        "name": user.get("name", ""),
+        "bio": user.get("bio", ""),
+        "location": user.get("location", ""),
+        "created_at": user["createdAt"],
+        "avatar_url": user.get("avatarUrl"),
+        "followers": (user.get("followers") or {}).get("totalCount", 0),
+        "following": (user.get("following") or {}).get("totalCount", 0),
+        "repositories": (user.get("repositories") or {}).get("totalCount", 0),
+        "total_commits": contributions.get("totalCommitContributions", 0),
+        "total_pullrequests": contributions.get("totalPullRequestContributions", 0),
+        "total_issues": contributions.get("totalIssueContributions", 0),
+    }
+
+
+def compact_repos(repositories: dict) -> dict:
+    """
+    Compacts one page of repositories into per-language counts.
+
+    Args:
+        repositories (dict): ``repositories`` object from a GraphQL response.
+
+    Returns:
+        dict: ``languages`` as ``(name, color, count)`` tuples in order of first appearance,
+        ``total_count``, ``has_next_page`` and ``end_cursor``.
+    """
+    languages = {}
+    for edge in repositories["edges"]:
+        language = edge["node"]["primaryLanguage"]
+        if language:
+            name = language["name"]
+            color, count = languages.get(name, (language.get("color", "#808080"), 0))
+            languages[name] = (color, count + 1)
+
+    page_info = repositories.get("pageInfo") or {}
+    return {
+        "languages": tuple((name, color, count) for name, (color, count) in languages.items()),
+        "total_count": repositories.get("totalCount", 0),
+        "has_next_page": bool(page_info.get("hasNextPage")),
+        "end_cursor": page_info.get("endCursor"),
+    }
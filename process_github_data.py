@@ -1,71 +1,94 @@
-from datetime import datetime
-from util import format_duration, is_less_than_2_months_old, format_iso_date, format_date_ddmmyyyy
+from datetime import date, datetime
+import numpy as np
+from contribution_series import ContributionIndex, ContributionSeries, streak_stats
+from forecast import forecast_year
+from payloads import compact_calendar, compact_repos, compact_user
+from util import DEFAULT_MILESTONES, format_duration, is_less_than_2_months_old, format_iso_date, format_date_ddmmyyyy, parse_iso_datetime
+
+def summarize_contributions(series: ContributionSeries, today: date = None, streaks: bool = True) -> dict:
+    """
+    Computes every calendar statistic from whole-array reductions over the daily counts.
+
+    Streaks come from ``streak_stats``, which works on whole runs rather than day by day.
+
+    Args:
+        series (ContributionSeries): Daily contribution counts.
+        today (date): Reference day for the current streak. Defaults to today.
+        streaks (bool): Also compute streaks. Callers that only need totals can skip them.
+
+    Returns:
+        dict: Total contributions, total days, active days, contributions per day, the highest
+        daily count and its index in the series (-1 if empty), and, with ``streaks``, the
+        ``streak_stats`` of the series (current and longest streak, every active run and the
+        gaps between them).
+    """
+    counts = series.counts
+    total_days = len(series)
+    total_contributions = int(counts.sum(dtype=np.int64))
+    # argmax returns the first of several equally high days
+    highest_index = int(counts.argmax()) if total_days else -1
+
+    summary = {
+        "total_contributions": total_contributions,
+        "total_days": total_days,
+        "active_days": int(np.count_nonzero(counts)),
+        "contribution_rate": total_contributions / total_days if total_days else 0.0,
+        "highest_contribution": int(counts[highest_index]) if total_days else 0,
+        "highest_index": highest_index,
+    }
+    if streaks:
+        stats = streak_stats(series, today)
+        summary.update({
+            "current_streak": stats["current_streak"],
+            "longest_streak": stats["longest_streak"],
+            "streaks": stats,
+        })
+    return summary
 
 def process_contribution_data(data: dict):
     """
     Process the contribution data from GitHub API response.
 
     Args:
-        data (dict): JSON response from GitHub API containing contribution data.
+        data (dict): Calendar payload from ``fetch_contribution_data``, or a raw JSON response
+            from GitHub API containing contribution data.
 
     Returns:
-        dict: Processed contribution data including total contributions, highest contribution, streaks, and active days.
+        dict: Processed contribution data including total contributions, highest contribution, streaks,
+        active days and the calendar as a ``ContributionSeries``.
     """
     try:
-        contributions_collection = data['data']['user']['contributionsCollection']
-        calendar = contributions_collection['contributionCalendar']
-        days = [day for week in calendar['weeks'] for day in week['contributionDays']]
-        
+        calendar = data if "series" in data else compact_calendar(data['data']['user']['contributionsCollection'])
+        series = calendar['series']
+
         # Safely get contribution counts with fallbacks to 0
-        public_contributions = calendar.get('totalContributions', 0)
-        private_contributions = contributions_collection.get('restrictedContributionsCount', 0)
+        public_contributions = calendar.get('total_contributions', 0)
+        private_contributions = calendar.get('restricted_contributions', 0)
         total_contributions = public_contributions + private_contributions
-        
+
         # Ensure we have valid contribution counts
         if not isinstance(public_contributions, (int, float)):
             public_contributions = 0
         if not isinstance(private_contributions, (int, float)):
             private_contributions = 0
-            
-        # Calculate highest contribution
-        try:
-            highest_day = max(days, key=lambda day: day['contributionCount'])
-            highest_contribution = highest_day['contributionCount']
-            highest_contribution_date = format_date_ddmmyyyy(highest_day['date'])
-        except (ValueError, KeyError):
-            highest_contribution = 0
-            highest_contribution_date = None
-        
-        current_streak = 0
-        longest_streak = 0
-        
-        # Calculate streaks with validation
-        try:
-            for day in days:
-                if day.get('contributionCount', 0) > 0:
-                    current_streak += 1
-                    longest_streak = max(longest_streak, current_streak)
-                else:
-                    current_streak = 0
-        except (TypeError, KeyError):
-            current_streak = 0
-            longest_streak = 0
-
-        # Extract contribution days
-        weeks = calendar.get("weeks", [])
-        contribution_days = [day["date"] for week in weeks for day in week["contributionDays"] if day["contributionCount"] > 0]
-        active_days = len(set(contribution_days))  # Unique active contribution days
+
+        # Highest day, streaks and active days from whole-array reductions
+        summary = summarize_contributions(series)
+        highest_contribution_date = None
+        if summary["highest_index"] >= 0:
+            highest_contribution_date = format_date_ddmmyyyy(series.date_at(summary["highest_index"]))
 
         return {
             "total_contributions": total_contributions,
             "public_contributions": public_contributions,
             "private_contributions": private_contributions,
-            "highest_contribution": highest_contribution,
+            "highest_contribution": summary["highest_contribution"],
             "highest_contribution_date": highest_contribution_date,
-            "current_streak": current_streak,
-            "longest_streak": longest_streak,
-            "active_days": active_days,
-            "days": days
+            "current_streak": summary["current_streak"],
+            "longest_streak": summary["longest_streak"],
+            "active_days": summary["active_days"],
+            "streaks": summary["streaks"],
+            "series": series
         }
     except (KeyError, TypeError) as e:
         print(f"Error processing contribution data: {str(e)}")
@@ -76,61 +99,85 @@ def process_contribution_data(data: dict):
             "highest_contribution": 0,
             "current_streak": 0,
             "longest_streak": 0,
-            "days": []
+            "series": ContributionSeries.empty()
         }
 
-def process_language_data(data: dict):
+def page_languages(page: dict):
     """
-    Process the language data from GitHub API response.
+    Reads the ``(name, color, count)`` language tuples of one repository page.
 
     Args:
-        data (dict): JSON response from GitHub API containing repository data.
+        page (dict): Repository page payload from ``fetch_repo_data`` or a raw JSON response.
 
     Returns:
-        dict: Dictionary of languages with their usage counts and colors.
+        tuple: The page's languages, or None for an error message or an unreadable page.
     """
+    if "errors" in page:
+        return None
+    if "languages" in page:
+        return page["languages"]
     try:
-        # Get repositories from the user data
-        repositories = data['data']['user']['repositories']['edges']
-        
-        # Process language data
-        language_data = {}
-        
-        for edge in repositories:
-            repo = edge['node']
-            if repo['primaryLanguage']:
-                language = repo['primaryLanguage']['name']
-                color = repo['primaryLanguage'].get('color', '#808080')  # Default to grey if no color
+        return compact_repos(page['data']['user']['repositories'])['languages']
+    except (KeyError, TypeError):
+        return None
 
-                if language not in language_data:
-                    language_data[language] = {'count': 0, 'color': color}
+def process_language_data(data):
+    """
+    Process the language data from GitHub API response.
 
-                language_data[language]['count'] += 1
-        
-        return language_data
-    except Exception as e:
-        print(f"Error processing language data: {str(e)}")
-        return None
+    A page that fails after the first one (e.g. an error or rate-limit payload) ends the
+    fold, and the languages counted so far are returned.
+
+    Args:
+        data (dict | Iterable[dict]): Repository page payload from ``fetch_repo_data`` or a raw JSON
+            response from GitHub API containing repository data, or an iterable of either
+            (e.g. ``iter_repo_pages``) folded in page by page.
+
+    Returns:
+        dict: Dictionary of languages with their usage counts and colors, or None if the first page failed.
+    """
+    pages = [data] if isinstance(data, dict) else data
+
+    # Process language data
+    language_data = {}
+
+    for number, page in enumerate(pages, 1):
+        # Languages arrive already counted per page
+        languages = page_languages(page)
+        if languages is None:
+            if number == 1:
+                print(f"Error processing language data: {page.get('errors', 'unexpected response')}")
+                return None
+            print(f"Warning: language data stops at page {number - 1}: {page.get('errors', 'unexpected response')}")
+            break
+
+        for language, color, count in languages:
+            if language not in language_data:
+                language_data[language] = {'count': 0, 'color': color}
+
+            language_data[language]['count'] += count
+
+    return language_data
 
 def process_user_data(data: dict):
     """
     Process the user data from GitHub API response.
 
     Args:
-        data (dict): JSON response from GitHub API containing user data.
+        data (dict): Profile payload from ``fetch_user_data``, or a raw JSON response from GitHub API containing user data.
 
     Returns:
         dict: Processed user data including name, bio, location, followers, following, repositories, and contributions.
     """
     try:
-        user_data = data['data']['user']
+        user_data = data if "created_at" in data else compact_user(data['data']['user'])
         
         # Calculate total GitHub days
-        created_at = user_data.get("createdAt")
+        created_at = user_data.get("created_at")
         formatted_date = format_iso_date(created_at) 
 
         less_than_2_months_old = is_less_than_2_months_old(created_at)
-        github_days = (datetime.now() - datetime.strptime(created_at, "%Y-%m-%dT%H:%M:%SZ")).days
+        github_days = (datetime.now() - parse_iso_datetime(created_at)).days
 
         joined_since = format_duration(created_at)
 
@@ -139,13 +186,13 @@ def process_user_data(data: dict):
             "bio": user_data.get("bio", ""),
             "location": user_data.get("location", ""),
             "created_at": created_at,
-            "avatar_url": user_data.get("avatarUrl"),
-            "followers": user_data.get("followers").get("totalCount", 0),
-            "following": user_data.get("following").get("totalCount", 0),
-            "repositories": user_data.get("repositories").get("totalCount", 0),
-            "total_commits": user_data.get("contributionsCollection").get("totalCommitContributions", 0),
-            "total_pullrequests": user_data.get("contributionsCollection").get("totalPullRequestContributions", 0),
-            "total_issues": user_data.get("contributionsCollection").get("totalIssueContributions", 0),
+            "avatar_url": user_data.get("avatar_url"),
+            "followers": user_data.get("followers", 0),
+            "following": user_data.get("following", 0),
+            "repositories": user_data.get("repositories", 0),
+            "total_commits": user_data.get("total_commits", 0),
+            "total_pullrequests": user_data.get("total_pullrequests", 0),
+            "total_issues": user_data.get("total_issues", 0),
             "formatted_date": formatted_date,
             "joined_since": joined_since,
             "github_days": github_days,
@@ -159,28 +206,94 @@ def process_user_data(data: dict):
     
    
 def analyze_contributions(data):
-    """Analyzes GitHub contribution data and provides key insights."""
-    if not data:
+    """
+    Analyzes GitHub contribution data and provides key insights.
+
+    Args:
+        data (dict | ContributionSeries): Calendar payload, JSON response from GitHub API containing
+            contribution data, or an already built ``ContributionSeries``.
+
+    Returns:
+        dict: Total contributions, total days, active days and contributions per day.
+    """
+    if data is None or (isinstance(data, dict) and not data):
         return None
 
     try:
-        contributions = data["data"]["user"]["contributionsCollection"]["contributionCalendar"]["weeks"]
-        
-        total_contributions = sum(
-            day["contributionCount"] for week in contributions for day in week["contributionDays"]
-        )
-        total_days = sum(1 for week in contributions for day in week["contributionDays"])
+        if isinstance(data, ContributionSeries):
+            series = data
+        else:
+            series = data["series"] if "series" in data else ContributionSeries.from_response(data)
+        summary = summarize_contributions(series, streaks=False)
 
-        contribution_rate = total_contributions / total_days  # Contributions per day
+        total_contributions = summary["total_contributions"]
+        total_days = summary["total_days"]
 
-        active_days = sum(1 for week in contributions for day in week["contributionDays"] if day["contributionCount"] > 0)
+        contribution_rate = total_contributions / total_days  # Contributions per day
 
         return {
             "total_contributions": total_contributions,
             "total_days": total_days,
-            "active_days": active_days,
+            "active_days": summary["active_days"],
             "contribution_rate": round(contribution_rate, 2)
         }
     except Exception as e:
         print(f"Error processing contribution data: {str(e)}")
-        return {"errors": str(e)}
\ No newline at end of file
+        return {"errors": str(e)}
+
+
+def analyze_range(index: ContributionIndex, from_date: str = None, to_date: str = None):
+    """
+    Answers the same questions as ``analyze_contributions`` for any date range from prefix sums,
+    without fetching the range from GitHub.
+
+    Args:
+        index (ContributionIndex): Prefix sums over the contribution calendar.
+        from_date (str): First day of the range ('YYYY-MM-DD'), or None for the start of the calendar.
+        to_date (str): Last day of the range ('YYYY-MM-DD'), or None for the end of the calendar.
+
+    Returns:
+        dict: Total contributions, total days, active days and contributions per day.
+    """
+    return {
+        "total_contributions": index.total(from_date, to_date),
+        "total_days": index.days(from_date, to_date),
+        "active_days": index.active_days(from_date, to_date),
+        "contribution_rate": round(index.rate(from_date, to_date), 2)
+    }
+
+
+def prepare_predictions(history_data: dict, milestones=DEFAULT_MILESTONES, today: date = None) -> dict:
+    """
+    Computes everything the predictions page shows for one history, so it can run ahead of time.
+
+    Args:
+        history_data (dict): Calendar payload covering at least last year and this year so far, or error message.
+        milestones (iterable): Milestones forecast up front; other sets are forecast by the page.
+        today (date): Last day of the current year so far. Defaults to today.
+
+    Returns:
+        dict: ``history``, its ``index``, ``current_year_series``, ``whole_year_stats`` (last
+        year), ``current_year_stats`` and ``forecasts`` keyed by the tuple of milestones,
+        or error message.
+    """
+    if "errors" in history_data:
+        return history_data
+    today = today or date.today()
+    last_year = (date(today.year - 1, 1, 1).isoformat(), date(today.year - 1, 12, 31).isoformat())
+    current_year = (date(today.year, 1, 1).isoformat(), today.isoformat())
+
+    history = history_data["series"]
+    index = ContributionIndex(history)
+    current_year_stats = analyze_range(index, *current_year)
+    forecast = forecast_year(
+        history, current_year_stats["total_contributions"], current_year_stats["active_days"], milestones, today=today
+    )
+    return {
+        "history": history,
+        "index": index,
+        "current_year_series": history.between(*current_year),
+        "whole_year_stats": analyze_range(index, *last_year),
+        "current_year_stats": current_year_stats,
+        "forecasts": {tuple(milestones): forecast},
+    }
@@ -0,0 +1,114 @@
+import streamlit as st
+
+from fetch_github_data import submit_fetch
+from github_client import token_key
+from process_github_data import prepare_predictions
+from util import DEFAULT_MILESTONES
+
+# Reports kept per browser session; the least recently used one is dropped first
+MAX_REPORTS = 8
+
+STATE_KEY = "reports"
+
+# Sidebar inputs of both pages by widget key, with their defaults; kept when switching pages
+SIDEBAR_INPUTS = {
+    "username": "",
+    "token": "",
+    "show_private": True,
+    "lifetime": False,
+    "progressive": True,
+    "milestones": ", ".join(str(m) for m in DEFAULT_MILESTONES),
+}
+
+
+def keep_sidebar_inputs():
+    """
+    Carries the sidebar inputs over to the page being run.
+
+    Streamlit drops a widget's value once a page without that widget runs. Re-assigning
+    every value before the widgets are created keeps it, so both pages share one username,
+    token and set of options. Call this at the top of every page, before the sidebar.
+    """
+    for name, default in SIDEBAR_INPUTS.items():
+        st.session_state[name] = st.session_state.get(name, default)
+
+
+def report_key(username: str, token: str, **options) -> tuple:
+    """
+    Key of a report: the user, the token it was fetched with and the options that change what is fetched.
+
+    Presentation-only options (such as showing private contributions) must not be part of
+    the key, so flipping them reuses the report. The token is kept only as a hash.
+
+    Args:
+        username (str): GitHub username.
+        token (str): GitHub personal access token.
+        **options: Options that change the fetched data, e.g. ``lifetime=True``.
+
+    Returns:
+        tuple: Hashable report key.
+    """
+    return (username.strip().lower(), token_key(token), tuple(sorted(options.items())))
+
+
+def get_report(key: tuple, state=None):
+    """
+    Returns the report saved under ``key`` in this session, or None.
+
+    Args:
+        key (tuple): Key from ``report_key``.
+        state (MutableMapping): Where reports are kept. Defaults to ``st.session_state``.
+    """
+    reports = (st.session_state if state is None else state).get(STATE_KEY, {})
+    report = reports.pop(key, None)
+    if report is not None:
+        # Re-insert so the dict stays in least-recently-used order
+        reports[key] = report
+    return report
+
+
+def save_report(key: tuple, report: dict, state=None) -> dict:
+    """
+    Saves a report for later reruns of this session, dropping the oldest beyond ``MAX_REPORTS``.
+
+    The report is kept by reference, so results added to it afterwards are kept too.
+
+    Args:
+        key (tuple): Key from ``report_key``.
+        report (dict): Fetch results and anything derived from them.
+        state (MutableMapping): Where reports are kept. Defaults to ``st.session_state``.
+
+    Returns:
+        dict: The saved report.
+    """
+    state = st.session_state if state is None else state
+    reports = state.setdefault(STATE_KEY, {})
+    reports.pop(key, None)
+    reports[key] = report
+    while len(reports) > MAX_REPORTS:
+        del reports[next(iter(reports))]
+    return report
+
+
+def share_predictions(username: str, token: str, history_data: dict) -> dict:
+    """
+    Saves the predictions page's report for a user and starts preparing it in the background.
+
+    Either page can call this as soon as it holds a history covering last year and this
+    year, so opening the predictions page costs no request and usually no computation.
+
+    Args:
+        username (str): GitHub username.
+        token (str): GitHub personal access token.
+        history_data (dict): Calendar payload (see ``payloads.series_payload``) or error message.
+
+    Returns:
+        dict: The saved report; ``prepared`` is a Future resolving to ``prepare_predictions``.
+    """
+    report = {"history_data": history_data, "prepared": submit_fetch(prepare_predictions, history_data)}
+    return save_report(report_key(username, token), report)
+
+
+def predictions_failed(report) -> bool:
+    """Whether a predictions report is missing or holds a failed fetch, so Track should fetch again."""
+    return report is None or "errors" in report["history_data"]
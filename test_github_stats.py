@@ -1,5 +1,34 @@
+import json
+import random
+import os
+import sqlite3
+import tempfile
+import threading
+import time
 import unittest
-from process_github_data import process_language_data
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import requests
+from process_github_data import process_language_data, analyze_contributions, analyze_range, prepare_predictions, process_contribution_data, summarize_contributions
+import fetch_github_data
+from fetch_github_data import (
+    fetch_contribution_windows, fetch_user_data, future_result, iter_repo_pages, split_overview_data, stitch_calendars,
+    submit_fetch, submit_lifetime_fetch, yearly_windows,
+)
+from contribution_series import (
+    ContributionIndex, ContributionSeries, aggregate_contributions, combine_segments, downsample, lttb_indices, merge_segments, rollup,
+    streak_stats, summarize_segment,
+)
+from calendar_store import CalendarStore, merge_intervals, missing_intervals
+from payloads import compact_calendar, compact_repos, compact_response, compact_user
+from forecast import fit_daily_model, forecast_year
+from util import find_milestone_dates, format_date_ddmmyyyy, format_dates_ddmmyyyy, format_duration, format_durations, get_milestone_dates, ordinal_suffix, parse_milestones
+from session_store import MAX_REPORTS, get_report, report_key, save_report
+from github_client import HIGH, LOW, CircuitOpenError, GitHubClient, RateLimitExceededError
 
 class TestGitHubStats(unittest.TestCase):
     def setUp(self):
@@ -70,11 +99,601 @@ class TestGitHubStats(unittest.TestCase):
         result = process_language_data(empty_data)
         self.assertEqual(result, {})
 
+    def test_process_language_data_pages(self):
+        # Test folding several repository pages
+        result = process_language_data(iter([self.mock_data, self.mock_data]))
+        self.assertEqual(result["Python"]["count"], 4)
+        self.assertEqual(result["JavaScript"]["count"], 2)
+
+    def test_process_language_data_compact(self):
+        # Test a page compacted by the fetch layer
+        page = compact_repos(self.mock_data["data"]["user"]["repositories"])
+        self.assertEqual(page["languages"], (("Python", "#3572A5", 2), ("JavaScript", "#f1e05a", 1)))
+        result = process_language_data(page)
+        self.assertEqual(result["Python"], {"count": 2, "color": "#3572A5"})
+
+    def test_process_language_data_keeps_pages_before_an_error(self):
+        result = process_language_data(iter([self.mock_data, {"errors": "API rate limit exceeded"}, self.mock_data]))
+        self.assertEqual(result["Python"]["count"], 2)
+        self.assertIsNone(process_language_data(iter([{"errors": "Bad credentials"}])))
+
     def test_process_language_data_invalid(self):
         # Test with invalid data
         invalid_data = {"data": {"user": {}}}
         result = process_language_data(invalid_data)
         self.assertIsNone(result)
 
+class TestOverviewData(unittest.TestCase):
+    def setUp(self):
+        calendar = {
+            "contributionCalendar": {
+                "totalContributions": 3,
+                "weeks": [{"contributionDays": [
+                    {"contributionCount": 1, "date": "2024-01-01"},
+                    {"contributionCount": 0, "date": "2024-01-02"},
+                    {"contributionCount": 2, "date": "2024-01-03"}
+                ]}]
+            }
+        }
+        self.mock_data = {
+            "data": {
+                "user": {
+                    "createdAt": "2020-01-01T00:00:00Z",
+                    "repositories": {"totalCount": 0, "edges": []},
+                    "contributionsCollection": calendar
+                }
+            }
+        }
+
+    def test_split_overview_data(self):
+        user = self.mock_data["data"]["user"]
+        overview = {
+            "user": compact_user(user),
+            "repos": compact_repos(user["repositories"]),
+            "contributions": compact_calendar(user["contributionsCollection"]),
+        }
+        split = split_overview_data(overview)
+        self.assertEqual(split["user"]["created_at"], "2020-01-01T00:00:00Z")
+        self.assertEqual(process_language_data(split["repos"]), {})
+        stats = analyze_contributions(split["contributions"])
+        self.assertEqual(stats["total_contributions"], 3)
+        self.assertEqual(stats["active_days"], 2)
+
+    def test_process_contribution_data(self):
+        stats = process_contribution_data(self.mock_data)
+        self.assertEqual(stats["highest_contribution"], 2)
+        self.assertEqual(stats["highest_contribution_date"], "3rd Jan, 2024")
+        # The mock calendar ended long ago, so no streak is running today
+        self.assertEqual(stats["current_streak"], 0)
+        self.assertEqual(stats["longest_streak"], 1)
+        self.assertEqual(stats["active_days"], 2)
+
+    def test_compact_payloads(self):
+        calendar = compact_response(self.mock_data, lambda user: compact_calendar(user["contributionsCollection"]))
+        self.assertEqual(calendar["total_contributions"], 3)
+        self.assertEqual(calendar["series"].counts.tolist(), [1, 0, 2])
+        self.assertEqual(process_contribution_data(calendar)["highest_contribution"], 2)
+        self.assertIn("errors", compact_response({"data": {"user": None}}, compact_user))
+        self.assertIn("errors", compact_response({"data": {"user": {}}}, compact_user))
+
+    def test_split_overview_data_errors(self):
+        split = split_overview_data({"errors": "boom"})
+        self.assertIn("errors", split["contributions"])
+        self.assertIn("errors", split["repos"])
+
+class TestContributionSeries(unittest.TestCase):
+    def test_from_days(self):
+        series = ContributionSeries.from_days(
+            ["2024-01-03", "2024-01-01", "2024-01-02", "2024-01-03"], [1, 2, 0, 5]
+        )
+        # Sorted by day, later duplicates win
+        self.assertEqual(series.counts.tolist(), [2, 0, 5])
+        self.assertEqual(series.date_at(0), "2024-01-01")
+        self.assertEqual(str(series.dates[-1]), "2024-01-03")
+        self.assertEqual(series.counts.dtype.itemsize, 2)
+
+    def test_between(self):
+        series = ContributionSeries.from_days(["2024-01-01", "2024-01-02", "2024-01-03"], [1, 2, 3])
+        self.assertEqual(series.between("2024-01-02").counts.tolist(), [2, 3])
+        self.assertEqual(series.between("2023-12-01", "2024-01-01").counts.tolist(), [1])
+        self.assertEqual(len(series.between("2024-02-01")), 0)
+
+class TestContributionIndex(unittest.TestCase):
+    def setUp(self):
+        # 2024-01-04 is missing from the calendar
+        self.series = ContributionSeries.from_days(
+            ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-05", "2024-01-06"], [2, 0, 4, 1, 3]
+        )
+        self.index = ContributionIndex(self.series)
+
+    def test_range_queries(self):
+        self.assertEqual(self.index.total("2024-01-02", "2024-01-05"), 5)
+        self.assertEqual(self.index.active_days("2024-01-02", "2024-01-05"), 2)
+        self.assertEqual(self.index.days("2024-01-02", "2024-01-05"), 3)
+        self.assertEqual(self.index.total("2023-12-01", "2023-12-31"), 0)
+        self.assertEqual(self.index.total(), 10)
+
+    def test_matches_analyze_contributions(self):
+        self.assertEqual(analyze_range(self.index, "2024-01-01", "2024-01-03"),
+                         analyze_contributions(self.series.between("2024-01-01", "2024-01-03")))
+
+    def test_moving_average(self):
+        averages = self.index.moving_averages(windows=(2,))
+        self.assertEqual(averages[2].tolist(), [2.0, 1.0, 2.0, 2.0, 0.5, 2.0])
+
+    def test_concat_prefers_later_series(self):
+        joined = ContributionSeries.concat([self.series, ContributionSeries.from_days(["2024-01-06", "2024-01-07"], [9, 1])])
+        self.assertEqual(joined.counts.tolist(), [2, 0, 4, 1, 9, 1])
+
+class TestAggregateCube(unittest.TestCase):
+    def test_breakdowns(self):
+        # 2020-12-31 (Thu) to 2021-01-04 (Mon); 2021-01-01..03 belong to ISO week 53 of 2020
+        series = ContributionSeries.from_days(
+            ["2020-12-31", "2021-01-01", "2021-01-02", "2021-01-03", "2021-01-04"], [1, 2, 0, 4, 8]
+        )
+        cube = aggregate_contributions(series)
+        self.assertEqual(cube.years.tolist(), [2020, 2021])
+        self.assertEqual(cube.year_totals.tolist(), [1, 14])
+        self.assertEqual([str(month) for month in cube.months], ["2020-12", "2021-01"])
+        self.assertEqual(list(zip(cube.iso_years.tolist(), cube.iso_weeks.tolist())), [(2020, 53), (2021, 1)])
+        self.assertEqual(cube.week_totals.tolist(), [7, 8])
+        self.assertEqual(cube.weekday_totals.tolist(), [8, 0, 0, 1, 2, 0, 4])
+        self.assertEqual(cube.weekday_active_days.tolist(), [1, 0, 0, 1, 1, 0, 1])
+        self.assertEqual(cube.weekend_totals.tolist(), [11, 4])
+
+    def test_digest_follows_content(self):
+        series = ContributionSeries.from_days(["2024-01-01", "2024-01-02"], [1, 2])
+        self.assertEqual(series.digest(), ContributionSeries.from_days(["2024-01-02", "2024-01-01"], [2, 1]).digest())
+        self.assertNotEqual(series.digest(), ContributionSeries.from_days(["2024-01-01", "2024-01-02"], [1, 3]).digest())
+
+class TestTimelineRollups(unittest.TestCase):
+    def test_rollup_weeks_and_months(self):
+        # 2024-01-06 is a Saturday, 2024-01-07 a Sunday
+        series = ContributionSeries.from_days(["2024-01-06", "2024-01-07", "2024-01-31", "2024-02-01"], [1, 2, 3, 4])
+        starts, totals = rollup(series, "W")
+        self.assertEqual([str(start) for start in starts], ["2023-12-31", "2024-01-07", "2024-01-28"])
+        self.assertEqual(totals.tolist(), [1, 2, 7])
+        starts, totals = rollup(series, "M")
+        self.assertEqual([str(start) for start in starts], ["2024-01-01", "2024-02-01"])
+        self.assertEqual(totals.tolist(), [6, 4])
+
+    def test_downsample_keeps_budget_ends_and_peak(self):
+        rng = random.Random(7)
+        days = [date.fromordinal(date(2010, 1, 1).toordinal() + i).isoformat() for i in range(5000)]
+        counts = [rng.choice([0, 0, 1, 3, 8]) for _ in days]
+        counts[2345] = 60
+        starts, totals = downsample(*rollup(ContributionSeries.from_days(days, counts), "D"), 200)
+        self.assertEqual(len(starts), 200)
+        self.assertEqual((str(starts[0]), str(starts[-1])), (days[0], days[-1]))
+        self.assertIn(days[2345], [str(start) for start in starts])
+        self.assertEqual(totals.max(), 60)
+
+    def test_short_series_is_unchanged(self):
+        self.assertEqual(lttb_indices(range(5), [1, 2, 3, 2, 1], 10).tolist(), [0, 1, 2, 3, 4])
+
+class TestStreakStats(unittest.TestCase):
+    def setUp(self):
+        # Runs: Jan 1-3, Jan 6, Jan 9-10 (Jan 11 is "today" and still empty)
+        self.series = ContributionSeries.from_days(
+            [f"2024-01-{day:02d}" for day in range(1, 12)],
+            [1, 2, 1, 0, 0, 4, 0, 0, 1, 1, 0]
+        )
+
+    def test_runs_and_gaps(self):
+        stats = streak_stats(self.series, today=date(2024, 1, 11))
+        self.assertEqual(stats["run_lengths"].tolist(), [3, 1, 2])
+        self.assertEqual(stats["longest_streak"], 3)
+        self.assertEqual(stats["gap_count"], 2)
+        self.assertEqual(stats["longest_gap"], 2)
+        self.assertEqual(stats["mean_gap"], 2.0)
+
+    def test_current_streak_tolerates_empty_today(self):
+        self.assertEqual(streak_stats(self.series, today=date(2024, 1, 11))["current_streak"], 2)
+        self.assertEqual(streak_stats(self.series, today=date(2024, 1, 12))["current_streak"], 0)
+
+    def test_missing_days_break_runs(self):
+        series = ContributionSeries.from_days(["2024-01-01", "2024-01-03"], [1, 1])
+        self.assertEqual(streak_stats(series, today=date(2024, 1, 3))["current_streak"], 1)
+
+    def test_empty(self):
+        stats = streak_stats(ContributionSeries.empty())
+        self.assertEqual((stats["current_streak"], stats["longest_streak"]), (0, 0))
+
+class TestSegmentSummaries(unittest.TestCase):
+    def test_merge_matches_whole_series(self):
+        rng = random.Random(7)
+        dates = [date.fromordinal(date(2023, 1, 1).toordinal() + i).isoformat() for i in range(120)]
+        for _ in range(50):
+            counts = [rng.choice([0, 1, 1, 3]) for _ in dates]
+            series = ContributionSeries.from_days(dates, counts)
+            cuts = sorted(rng.sample(range(1, len(dates)), 3))
+            parts = [series.between(dates[a], dates[b - 1]) for a, b in zip([0] + cuts, cuts + [len(dates)])]
+            merged = combine_segments(summarize_segment(part) for part in parts)
+            self.assertEqual(merged, summarize_segment(series))
+
+    def test_run_across_year_boundary(self):
+        last_year = summarize_segment(ContributionSeries.from_days(["2023-12-30", "2023-12-31"], [0, 2]))
+        this_year = summarize_segment(ContributionSeries.from_days(["2024-01-01", "2024-01-02"], [1, 1]))
+        merged = merge_segments(last_year, this_year)
+        self.assertEqual((last_year.longest_run, this_year.longest_run, merged.longest_run), (1, 2, 3))
+        self.assertEqual(merged.suffix_run, 3)
+        with self.assertRaises(ValueError):
+            merge_segments(this_year, last_year)
+
+class TestMilestones(unittest.TestCase):
+    def setUp(self):
+        self.series = ContributionSeries.from_days(["2024-01-01", "2024-01-02", "2024-01-03"], [0, 60, 50])
+
+    def test_find_milestone_dates(self):
+        dates, achieved = find_milestone_dates([50, 100, 110, 200], self.series, 110, 10, now=datetime(2024, 1, 3, 12))
+        self.assertEqual([str(day) for day in dates], ["2024-01-02", "2024-01-03", "2024-01-03", "2024-01-12"])
+        self.assertEqual(achieved.tolist(), [True, True, True, False])
+
+    def test_not_achievable(self):
+        milestone_dates = get_milestone_dates([100, 500], self.series, 110, 0)
+        self.assertEqual(milestone_dates, {100: "2024-01-03", 500: "Not achievable"})
+
+    def test_parse_milestones(self):
+        self.assertEqual(parse_milestones("500, 100, 1k, 100"), [100, 500, 1000])
+        self.assertEqual(parse_milestones("100, lots"), [])
+
+class TestDateUtilities(unittest.TestCase):
+    def test_ordinal_suffix(self):
+        suffixes = [ordinal_suffix(day) for day in (1, 2, 3, 4, 11, 12, 13, 21, 22, 23, 31)]
+        self.assertEqual(suffixes, ["st", "nd", "rd", "th", "th", "th", "th", "st", "nd", "rd", "st"])
+        self.assertEqual(format_date_ddmmyyyy("2024-03-12"), "12th Mar, 2024")
+
+    def test_array_formatting_matches_scalar(self):
+        dates = ["2024-01-01", "2024-02-11", "2024-02-22", "2024-03-13", "2024-12-31"]
+        self.assertEqual(format_dates_ddmmyyyy(dates).tolist(), [format_date_ddmmyyyy(day) for day in dates])
+        self.assertEqual(format_dates_ddmmyyyy(np.array(["2024-02-22", "NaT"], dtype="datetime64[D]")).tolist(), ["22nd Feb, 2024", ""])
+
+    def test_calendar_correct_durations(self):
+        now = datetime(2024, 3, 1, 12)
+        durations = format_durations(["2024-01-31T00:00:00Z", "2023-03-01T12:00:00Z", "2024-03-01T11:00:00Z"], now=now)
+        self.assertEqual(durations.tolist(), ["1 month 1 day", "1 year", "0 days"])
+        self.assertEqual(format_duration("2020-02-29T00:00:00Z").split()[1], "years")
+
+class TestForecast(unittest.TestCase):
+    def setUp(self):
+        # Four weeks from Monday 2024-01-01: two contributions on weekdays, none at weekends
+        days = [date.fromordinal(date(2024, 1, 1).toordinal() + offset) for offset in range(28)]
+        self.series = ContributionSeries.from_days([day.isoformat() for day in days], [2 if day.weekday() < 5 else 0 for day in days])
+
+    def test_fit_weekday_effects(self):
+        model = fit_daily_model(self.series)
+        self.assertEqual(model.active_probability.tolist(), [1, 1, 1, 1, 1, 0, 0])
+        self.assertTrue((model.table[:5] == 2).all())
+        self.assertTrue((model.table[5:] == 0).all())
+
+    def test_deterministic_forecast(self):
+        # Friday 2024-12-20 leaves 7 weekdays and 4 weekend days in the year
+        forecast = forecast_year(self.series, 500, 250, milestones=[400, 510, 520], today=date(2024, 12, 20), simulations=100)
+        self.assertEqual(forecast["year_end_total"].tolist(), [514, 514, 514])
+        self.assertEqual(forecast["year_end_active_days"].tolist(), [257, 257, 257])
+        self.assertEqual(list(forecast["milestone_dates"]), [510, 520])
+        self.assertEqual(str(forecast["milestone_dates"][510][1]), "2024-12-27")
+        self.assertEqual(str(forecast["milestone_dates"][520][1]), "2025-01-03")
+        self.assertEqual(forecast["milestone_odds"], {510: 1.0, 520: 0.0})
+
+    def test_seeded_forecast_is_repeatable(self):
+        series = ContributionSeries.from_days(["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"], [0, 3, 1, 0])
+        first = forecast_year(series, 4, 2, milestones=[50], today=date(2024, 1, 4), simulations=500)
+        second = forecast_year(series, 4, 2, milestones=[50], today=date(2024, 1, 4), simulations=500)
+        self.assertEqual(first["year_end_total"].tolist(), second["year_end_total"].tolist())
+        self.assertLessEqual(first["year_end_total"][0], first["year_end_total"][2])
+
+    def test_prepare_predictions(self):
+        prepared = prepare_predictions({"series": self.series}, milestones=[100], today=date(2024, 1, 14))
+        self.assertEqual(prepared["current_year_stats"], analyze_contributions(self.series.between("2024-01-01", "2024-01-14")))
+        self.assertEqual(prepared["whole_year_stats"]["total_contributions"], 0)
+        self.assertEqual(list(prepared["forecasts"]), [(100,)])
+        self.assertEqual(prepare_predictions({"errors": "Bad credentials"}), {"errors": "Bad credentials"})
+
+class TestFigureCache(unittest.TestCase):
+    def test_language_pie_png(self):
+        from app import language_pie_png
+        png = language_pie_png((("Python", 2, "#3572A5"), ("Go", 1, "#00ADD8")))
+        self.assertTrue(png.startswith(b"\x89PNG"))
+        self.assertEqual(language_pie_png((("Python", 2, "#3572A5"), ("Go", 1, "#00ADD8"))), png)
+
+    def test_weekday_figure_spec(self):
+        from app import weekday_figure_spec
+        spec = weekday_figure_spec((1, 2), ("Sunday", "Saturday"))
+        self.assertEqual(list(spec["data"][0]["x"]), [1, 2])
+        self.assertEqual(spec["layout"]["height"], 150)
+
+class TestSessionStore(unittest.TestCase):
+    def test_key_ignores_case_and_hides_token(self):
+        key = report_key("Octocat", "secret", lifetime=True)
+        self.assertEqual(key, report_key("octocat", "secret", lifetime=True))
+        self.assertNotEqual(key, report_key("octocat", "secret", lifetime=False))
+        self.assertNotIn("secret", repr(key))
+
+    def test_least_recently_used_report_is_dropped(self):
+        state = {}
+        keys = [report_key(f"user{i}", "token") for i in range(MAX_REPORTS + 1)]
+        for key in keys[:MAX_REPORTS]:
+            save_report(key, {"user": key[0]}, state)
+        get_report(keys[0], state)
+        save_report(keys[-1], {}, state)
+        self.assertIsNone(get_report(keys[1], state))
+        self.assertEqual(get_report(keys[0], state), {"user": "user0"})
+
+class TestLifetimeHistory(unittest.TestCase):
+    def test_yearly_windows(self):
+        windows = yearly_windows("2022-06-15T10:00:00Z", until=date(2024, 3, 1))
+        self.assertEqual(windows, [
+            ("2022-06-15", "2022-12-31"),
+            ("2023-01-01", "2023-12-31"),
+            ("2024-01-01", "2024-03-01"),
+        ])
+
+    def test_stitch_calendars(self):
+        def window(days, restricted):
+            return compact_calendar({
+                "restrictedContributionsCount": restricted,
+                "contributionCalendar": {
+                    "totalContributions": sum(count for _, count in days),
+                    "weeks": [{"contributionDays": [{"date": d, "contributionCount": c} for d, c in days]}]
+                }
+            })
+        stitched = stitch_calendars([
+            window([("2023-12-30", 1), ("2023-12-31", 2)], 1),
+            window([("2024-01-01", 3)], 2),
+        ])
+        self.assertEqual(stitched["restricted_contributions"], 3)
+        self.assertEqual(stitched["total_contributions"], 6)
+        stats = analyze_contributions(stitched)
+        self.assertEqual(stats["total_days"], 3)
+        self.assertEqual(stats["active_days"], 3)
+
+    def test_summarize_contributions(self):
+        series = ContributionSeries.from_days(["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"], [0, 5, 5, 2])
+        summary = summarize_contributions(series, today=date(2024, 1, 4))
+        self.assertEqual((summary["total_contributions"], summary["active_days"]), (12, 3))
+        # The first of two equally high days is reported
+        self.assertEqual((summary["highest_contribution"], summary["highest_index"]), (5, 1))
+        self.assertEqual((summary["current_streak"], summary["longest_streak"]), (3, 3))
+        self.assertNotIn("streaks", summarize_contributions(series, streaks=False))
+        self.assertEqual(summarize_contributions(ContributionSeries.empty())["highest_index"], -1)
+
+    def test_failed_future_becomes_error(self):
+        failed = ThreadPoolExecutor(max_workers=1).submit(lambda: 1 / 0)
+        self.assertIn("errors", future_result(failed))
+
+    def test_failed_requests_are_not_cached(self):
+        fetch_user_data.clear()
+        responses = [CircuitOpenError("GitHub API is unavailable"), {"data": {"user": None}}]
+        with mock.patch.object(fetch_github_data.client, "post_query", side_effect=responses) as post_query:
+            with self.assertRaises(CircuitOpenError):
+                fetch_user_data("octocat", "token")
+            self.assertEqual(fetch_user_data("octocat", "token"), {"errors": "User not found."})
+        self.assertEqual(post_query.call_count, 2)
+        fetch_user_data.clear()
+
+    def test_graphql_errors_are_not_cached(self):
+        fetch_user_data.clear()
+        responses = [{"errors": [{"message": "Something went wrong while executing your query."}]}, {"data": {"user": None}}]
+        with mock.patch.object(fetch_github_data.client, "post_query", side_effect=responses) as post_query:
+            self.assertEqual(future_result(submit_fetch(fetch_user_data, "octocat", "token")),
+                             {"errors": "Something went wrong while executing your query."})
+            # Fetching again, as Track does for a failed report, asks GitHub again
+            self.assertEqual(fetch_user_data("octocat", "token"), {"errors": "User not found."})
+        self.assertEqual(post_query.call_count, 2)
+        fetch_user_data.clear()
+
+    def test_lifetime_history_is_fetched_at_high_priority(self):
+        fetch_contribution_windows.clear()
+        with mock.patch.object(fetch_github_data.client, "post_query", return_value={"data": {"user": None}}) as post_query:
+            self.assertIn("errors", future_result(submit_lifetime_fetch("octocat", "token", "2020-05-01T00:00:00Z")))
+        self.assertEqual({call.args[2] for call in post_query.call_args_list}, {HIGH})
+        fetch_contribution_windows.clear()
+
+    def test_failed_repo_page_becomes_error(self):
+        first_page = {"repos": [], "total_count": 200, "has_next_page": True, "end_cursor": "c1"}
+        with mock.patch.object(fetch_github_data, "fetch_repo_data", side_effect=CircuitOpenError("unavailable")):
+            pages = list(iter_repo_pages("octocat", "token", first_page=first_page))
+        self.assertEqual(pages, [first_page, {"errors": "unavailable"}])
+
+class TestCalendarStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = CalendarStore(os.path.join(self.tmpdir.name, "calendar.db"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        days = [("2024-01-06", 1), ("2024-01-07", 0), ("2024-01-08", 4)]
+        self.store.save_days("Octocat", "token", days, date(2024, 1, 6), date(2024, 1, 8), settled_through=date(2024, 1, 7))
+        # The unsettled last day is stored but not held
+        self.assertEqual(self.store.held_intervals("octocat", "token"), [(date(2024, 1, 6), date(2024, 1, 7))])
+
+        series = self.store.load_series("octocat", "token", "2024-01-07", "2024-01-08")
+        self.assertEqual(series.items(), [("2024-01-07", 0), ("2024-01-08", 4)])
+        stats = analyze_contributions(series)
+        self.assertEqual(stats["total_contributions"], 4)
+        self.assertEqual(stats["active_days"], 1)
+
+    def test_held_intervals_merge(self):
+        self.store.save_days("octocat", "token", [], date(2024, 1, 1), date(2024, 1, 10), settled_through=date(2024, 12, 31))
+        self.store.save_days("octocat", "token", [], date(2024, 1, 11), date(2024, 1, 20), settled_through=date(2024, 12, 31))
+        self.store.save_days("octocat", "token", [], date(2024, 3, 1), date(2024, 3, 5), settled_through=date(2024, 12, 31))
+        self.assertEqual(self.store.held_intervals("octocat", "token"), [
+            (date(2024, 1, 1), date(2024, 1, 20)),
+            (date(2024, 3, 1), date(2024, 3, 5)),
+        ])
+
+    def test_days_are_kept_per_token(self):
+        self.store.save_days("octocat", "token", [("2024-01-01", 3)], date(2024, 1, 1), date(2024, 1, 1), settled_through=date(2024, 12, 31))
+        self.assertEqual(self.store.held_intervals("octocat", "other-token"), [])
+        self.assertEqual(len(self.store.load_series("octocat", "other-token")), 0)
+        self.assertEqual(self.store.load_series("octocat", "token").items(), [("2024-01-01", 3)])
+
+    def test_concurrent_saves_keep_every_interval(self):
+        # Separate stores share no lock, like separate processes sharing the database file
+        stores = [CalendarStore(self.store.path) for _ in range(4)]
+        intervals = [(date(2024, 1, 1) + timedelta(days=3 * i), date(2024, 1, 1) + timedelta(days=3 * i)) for i in range(20)]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(
+                lambda i: stores[i % 4].save_days("octocat", "token", [], *intervals[i], settled_through=date(2024, 12, 31)),
+                range(len(intervals))
+            ))
+        self.assertEqual(self.store.held_intervals("octocat", "token"), intervals)
+
+    def test_unavailable_store_raises(self):
+        store = CalendarStore(os.path.join(self.tmpdir.name, "file", "calendar.db"))
+        open(os.path.join(self.tmpdir.name, "file"), "w").close()
+        with self.assertRaises((sqlite3.Error, OSError)):
+            store.held_intervals("octocat", "token")
+
+    def test_missing_intervals(self):
+        held = merge_intervals([(date(2024, 2, 1), date(2024, 2, 10)), (date(2024, 1, 1), date(2024, 1, 31))])
+        self.assertEqual(held, [(date(2024, 1, 1), date(2024, 2, 10))])
+        self.assertEqual(missing_intervals(held, date(2024, 1, 5), date(2024, 2, 1)), [])
+        self.assertEqual(
+            missing_intervals(held, date(2023, 12, 1), date(2024, 3, 1)),
+            [(date(2023, 12, 1), date(2023, 12, 31)), (date(2024, 2, 11), date(2024, 3, 1))]
+        )
+
+class StubGitHubHandler(BaseHTTPRequestHandler):
+    # Statuses (or (status, headers) pairs) to answer with, one per request; 200 once the script runs out
+    script = []
+    calls = 0
+    # Reported as the rateLimit field when a query asks for it
+    rate_limit = {"cost": 1, "remaining": 4999, "limit": 5000, "resetAt": "2999-01-01T00:00:00Z"}
+
+    delay = 0
+
+    def do_POST(self):
+        query = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["query"]
+        type(self).calls += 1
+        time.sleep(type(self).delay)
+        status = type(self).script.pop(0) if type(self).script else 200
+        status, headers = status if isinstance(status, tuple) else (status, {})
+        data = {"user": {"name": "stub"}}
+        if "rateLimit" in query:
+            data["rateLimit"] = type(self).rate_limit
+        body = json.dumps({"data": data} if status == 200 else {"message": "error"}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestGitHubClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubGitHubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/graphql"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubGitHubHandler.script = []
+        StubGitHubHandler.calls = 0
+        StubGitHubHandler.delay = 0
+        StubGitHubHandler.rate_limit = {"cost": 1, "remaining": 4999, "limit": 5000, "resetAt": "2999-01-01T00:00:00Z"}
+
+    def make_client(self, **kwargs):
+        return GitHubClient(base_url=self.url, backoff_base=0.001, backoff_cap=0.01, **kwargs)
+
+    def test_retries_server_errors(self):
+        StubGitHubHandler.script = [502, 503]
+        result = self.make_client(max_retries=3).post_query("{ viewer { login } }", "token")
+        self.assertEqual(result["data"]["user"]["name"], "stub")
+        self.assertEqual(StubGitHubHandler.calls, 3)
+
+    def test_does_not_retry_client_errors(self):
+        StubGitHubHandler.script = [401]
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.make_client().post_query("{ viewer { login } }", "token")
+        self.assertEqual(StubGitHubHandler.calls, 1)
+
+    def test_circuit_breaker_opens(self):
+        StubGitHubHandler.script = [500] * 4
+        client = self.make_client(max_retries=1, failure_threshold=2, reset_timeout=60)
+        for _ in range(2):
+            with self.assertRaises(requests.exceptions.HTTPError):
+                client.post_query("{ viewer { login } }", "token")
+        with self.assertRaises(CircuitOpenError):
+            client.post_query("{ viewer { login } }", "token")
+        self.assertEqual(StubGitHubHandler.calls, 4)
+
+    def test_half_open_circuit_admits_one_trial(self):
+        StubGitHubHandler.script = [500]
+        client = self.make_client(max_retries=0, failure_threshold=1, reset_timeout=0.05)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            client.post_query("{ viewer { login } }", "token")
+        time.sleep(0.1)
+        StubGitHubHandler.delay = 0.2
+
+        def call(query):
+            try:
+                return client.post_query(query, "token")
+            except CircuitOpenError:
+                return None
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            results = list(pool.map(call, ["{ a }", "{ b }", "{ c }"]))
+        self.assertEqual(sum(result is not None for result in results), 1)
+        self.assertEqual(StubGitHubHandler.calls, 2)
+        # The successful trial closes the circuit
+        StubGitHubHandler.delay = 0
+        client.post_query("{ viewer { login } }", "token")
+
+    def test_retry_after_is_honoured_or_gives_up(self):
+        StubGitHubHandler.script = [(403, {"Retry-After": "0"})]
+        self.make_client().post_query("{ viewer { login } }", "token")
+        self.assertEqual(StubGitHubHandler.calls, 2)
+        StubGitHubHandler.script = [(429, {"Retry-After": "3600"})]
+        with self.assertRaises(RateLimitExceededError):
+            self.make_client().post_query("{ viewer { login } }", "token")
+        self.assertEqual(StubGitHubHandler.calls, 3)
+
+    def test_exhausted_quota_fails_fast(self):
+        StubGitHubHandler.script = [(403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 600)})]
+        with self.assertRaises(RateLimitExceededError):
+            self.make_client(max_retries=3).post_query("{ viewer { login } }", "token")
+        self.assertEqual(StubGitHubHandler.calls, 1)
+
+    def test_records_rate_limit_budget(self):
+        client = self.make_client()
+        result = client.post_query("{ viewer { login } }", "token")
+        self.assertNotIn("rateLimit", result["data"])
+        self.assertEqual(client.budget("token").remaining, 4999)
+        self.assertIsNone(client.budget("other-token"))
+
+    def test_sheds_low_priority_when_budget_is_low(self):
+        StubGitHubHandler.rate_limit = {"cost": 5, "remaining": 100, "limit": 5000, "resetAt": "2999-01-01T00:00:00Z"}
+        client = self.make_client()
+        client.post_query("{ viewer { login } }", "token")
+        with self.assertRaises(RateLimitExceededError):
+            client.post_query("{ viewer { login } }", "token", LOW)
+        # High-priority queries still go through while budget remains
+        client.post_query("{ viewer { login } }", "token")
+        self.assertEqual(StubGitHubHandler.calls, 2)
+
+    def test_coalesces_identical_in_flight_queries(self):
+        StubGitHubHandler.delay = 0.2
+        client = self.make_client()
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda _: client.post_query("{ viewer { login } }", "token"), range(5)))
+        self.assertEqual(StubGitHubHandler.calls, 1)
+        self.assertTrue(all(result == results[0] for result in results))
+        # Different tokens are never coalesced
+        client.post_query("{ viewer { login } }", "other-token")
+        self.assertEqual(StubGitHubHandler.calls, 2)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -1,24 +1,35 @@
-from datetime import datetime, timedelta
+import os
+import time
+from datetime import datetime
+from functools import lru_cache
+import numpy as np
 from dateutil.relativedelta import relativedelta
 
-def format_duration(iso_date:str) -> str:
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+MONTH_ABBREVIATIONS = np.array(["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])
+
+@lru_cache(maxsize=4096)
+def parse_iso_datetime(iso_date:str) -> datetime:
     """
-    Formats the duration from the given ISO date to the current date in years, months, and days.
+    Parses an ISO timestamp such as "2023-02-07T12:34:56Z". Results are memoized.
 
     Args:
-        iso_date (str): The ISO formatted date string (e.g., "2023-02-07T12:34:56Z").
+        iso_date (str): The ISO formatted date string.
 
     Returns:
-        str: The formatted duration string (e.g., "2 years 3 months 5 days").
+        datetime: The parsed (naive, UTC) datetime.
     """
-    created_at = datetime.strptime(iso_date, "%Y-%m-%dT%H:%M:%SZ")
-    now = datetime.now()
-    delta = now - created_at
+    return datetime.strptime(iso_date, ISO_FORMAT)
 
-    years = delta.days // 365
-    months = (delta.days % 365) // 30
-    days = (delta.days % 365) % 30
+def ordinal_suffix(day:int) -> str:
+    """
+    Returns the English ordinal suffix for a number (1 -> "st", 12 -> "th", 22 -> "nd").
+    """
+    if 11 <= day % 100 <= 13:
+        return "th"
+    return {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
 
+def _duration_parts(years:int, months:int, days:int) -> str:
     parts = []
     if years:
         parts.append(f"{years} year{'s' if years > 1 else ''}")
@@ -29,9 +40,23 @@ def format_duration(iso_date:str) -> str:
 
     return " ".join(parts) if parts else "0 days"
 
+def format_duration(iso_date:str) -> str:
+    """
+    Formats the duration from the given ISO date to the current date in years, months, and days.
+
+    Args:
+        iso_date (str): The ISO formatted date string (e.g., "2023-02-07T12:34:56Z").
+
+    Returns:
+        str: The formatted duration string (e.g., "2 years 3 months 5 days").
+    """
+    delta = relativedelta(datetime.now(), parse_iso_datetime(iso_date))
+    return _duration_parts(delta.years, delta.months, delta.days)
+
+@lru_cache(maxsize=4096)
 def format_date_ddmmyyyy(date:str) -> str:
     """
-    Formats a date string from 'YYYY-MM-DD' to 'DDth MMM, YYYY'.
+    Formats a date string from 'YYYY-MM-DD' to 'DDth MMM, YYYY'. Results are memoized.
 
     Args:
         date (str): The date string in 'YYYY-MM-DD' format.
@@ -40,21 +65,21 @@ def format_date_ddmmyyyy(date:str) -> str:
         str: The formatted date string (e.g., "7th Feb, 2025").
     """
     date_obj = datetime.strptime(date, '%Y-%m-%d')
-    formated_date = date_obj.strftime("{day} %b, %Y").replace("{day}", str(date_obj.day) + ("st" if date_obj.day in [1, 21, 31] else "nd" if date_obj.day in [2, 22] else "rd" if date_obj.day in [3, 23] else "th"))
-    return formated_date
+    return f"{date_obj.day}{ordinal_suffix(date_obj.day)} {date_obj:%b, %Y}"
 
+@lru_cache(maxsize=4096)
 def format_iso_date(iso_date:str) -> str:
     """
-    Formats an ISO date string to 'DDth MMM, YYYY'.
+    Formats an ISO date string to 'DDth MMM, YYYY'. Results are memoized.
 
     Args:
         iso_date (str): The ISO date string (e.g., "2023-02-07T12:34:56Z").
 
     Returns:
-        str: The formatted date string (e.g., "7th Feb, 202
+        str: The formatted date string (e.g., "7th Feb, 2023").
     """
-    dt = datetime.strptime(iso_date, "%Y-%m-%dT%H:%M:%SZ")
-    return dt.strftime("{day} %b, %Y").replace("{day}", str(dt.day) + ("st" if dt.day in [1, 21, 31] else "nd" if dt.day  in [2, 22] else "rd" if dt.day in [3, 23] else "th"))
+    dt = parse_iso_datetime(iso_date)
+    return f"{dt.day}{ordinal_suffix(dt.day)} {dt:%b, %Y}"
 
 def is_less_than_2_months_old(iso_date:str) -> bool:
     """
@@ -66,13 +91,98 @@ def is_less_than_2_months_old(iso_date:str) -> bool:
     Returns:
         bool: True if the date is less than 2 months old, False otherwise.
     """
-    created_date = datetime.strptime(iso_date, "%Y-%m-%dT%H:%M:%SZ")
     two_months_ago = datetime.now() - relativedelta(months=2)
-    return created_date > two_months_ago
+    return parse_iso_datetime(iso_date) > two_months_ago
+
+# --- Array versions for whole columns ---
+
+def parse_iso_datetimes(iso_dates) -> np.ndarray:
+    """
+    Parses a column of ISO timestamps (e.g. "2023-02-07T12:34:56Z") at once.
+
+    Returns:
+        np.ndarray: ``datetime64[s]`` array.
+    """
+    return np.char.rstrip(np.asarray(iso_dates, dtype=str), "Z").astype("datetime64[s]")
+
+def format_dates_ddmmyyyy(dates) -> np.ndarray:
+    """
+    Formats a column of dates as 'DDth MMM, YYYY' at once.
+
+    Args:
+        dates (array-like): 'YYYY-MM-DD' strings, ISO timestamps or ``datetime64`` values.
+
+    Returns:
+        np.ndarray: Formatted date strings (e.g., "7th Feb, 2025"), empty for NaT.
+    """
+    dates = np.asarray(dates)
+    if dates.dtype.kind in "US":
+        dates = np.char.rstrip(dates.astype(str), "Z")
+    days = dates.astype("datetime64[D]")
+    missing = np.isnat(days)
+    days = np.where(missing, np.datetime64("1970-01-01"), days)
+    months = days.astype("datetime64[M]")
+    years = days.astype("datetime64[Y]").astype(np.int64) + 1970
+    day_of_month = (days - months).astype(np.int64) + 1
+    month_index = months.astype(np.int64) % 12
+
+    suffixes = np.where(day_of_month % 10 == 1, "st", np.where(day_of_month % 10 == 2, "nd", np.where(day_of_month % 10 == 3, "rd", "th")))
+    suffixes = np.where((day_of_month % 100 >= 11) & (day_of_month % 100 <= 13), "th", suffixes)
+
+    formatted = np.char.add(day_of_month.astype(str), suffixes)
+    formatted = np.char.add(np.char.add(formatted, " "), MONTH_ABBREVIATIONS[month_index])
+    return np.where(missing, "", np.char.add(np.char.add(formatted, ", "), years.astype(str)))
+
+def calendar_deltas(start, end) -> tuple:
+    """
+    Calendar-correct years, months and days between two columns of timestamps.
+
+    Matches ``dateutil.relativedelta(end, start)``: whole months are counted first
+    (clipping to the end of shorter months), then the remaining whole days.
+
+    Args:
+        start (array-like): ``datetime64`` values.
+        end (array-like): ``datetime64`` values, not earlier than ``start``.
+
+    Returns:
+        tuple: ``(years, months, days)`` integer arrays.
+    """
+    start = np.asarray(start, dtype="datetime64[s]")
+    end = np.asarray(end, dtype="datetime64[s]")
+    start_day = start.astype("datetime64[D]")
+    start_month = start_day.astype("datetime64[M]")
+    day_of_month = (start_day - start_month).astype(np.int64)
+    time_of_day = start - start_day
+
+    def anchor(months):
+        # start + months, keeping the day of month but clipping to the month's last day
+        target = start_month + months
+        month_length = ((target + 1).astype("datetime64[D]") - target.astype("datetime64[D]")).astype(np.int64)
+        return target.astype("datetime64[D]") + np.minimum(day_of_month, month_length - 1) + time_of_day
+
+    total_months = (end.astype("datetime64[M]") - start_month).astype(np.int64)
+    total_months = np.where(anchor(total_months) > end, total_months - 1, total_months)
+    days = ((end - anchor(total_months)) // np.timedelta64(1, "D")).astype(np.int64)
+    return total_months // 12, total_months % 12, days
+
+def format_durations(iso_dates, now: datetime = None) -> np.ndarray:
+    """
+    Array version of ``format_duration`` for a whole column of ISO timestamps.
 
+    Args:
+        iso_dates (array-like): ISO formatted date strings (e.g., "2023-02-07T12:34:56Z").
+        now (datetime): End of every duration. Defaults to now.
+
+    Returns:
+        np.ndarray: Formatted duration strings (e.g., "2 years 3 months 5 days").
+    """
+    years, months, days = calendar_deltas(parse_iso_datetimes(iso_dates), np.datetime64(now or datetime.now(), "s"))
+    return np.array([_duration_parts(*parts) for parts in zip(years.tolist(), months.tolist(), days.tolist())], dtype=object)
+
+@lru_cache(maxsize=1)
 def load_css() -> str:
     """
-    Loads CSS stylesheet from local files.
+    Loads CSS stylesheet from local files. The file is read once per process.
 
     Returns:
         str: The content of the CSS file.
@@ -90,6 +200,45 @@ def load_css() -> str:
     except Exception as e:
         print(f"❗Error loading stylesheet: {e}")
 
+# --- Start-up and render timings ---
+
+# Set GITHUB_STATS_TIMINGS=1 to print timings to the server log and show them in the sidebar
+SHOW_TIMINGS = os.environ.get("GITHUB_STATS_TIMINGS") == "1"
+
+_first_timings = {}
+_last_timings = {}
+
+def record_timing(name: str, started: float) -> float:
+    """
+    Records the time elapsed since ``started`` under ``name``.
+
+    The first measurement of each name in the process (the cold start) is kept next to
+    the latest one.
+
+    Args:
+        name (str): What was measured, e.g. "imports" or "render".
+        started (float): ``time.perf_counter()`` value at the start of the measurement.
+
+    Returns:
+        float: Elapsed seconds.
+    """
+    elapsed = time.perf_counter() - started
+    _first_timings.setdefault(name, elapsed)
+    _last_timings[name] = elapsed
+    if SHOW_TIMINGS:
+        print(f"⏱️ {name}: {elapsed * 1000:.0f} ms")
+    return elapsed
+
+def timing_summary() -> str:
+    """
+    Returns:
+        str: Latest and first timing of every recorded name (e.g. "imports 12 ms (first 610 ms)").
+    """
+    return ", ".join(
+        f"{name} {elapsed * 1000:.0f} ms (first {_first_timings[name] * 1000:.0f} ms)"
+        for name, elapsed in _last_timings.items()
+    )
+
 def predict_days_to_milestone(current_contributions, milestone, contribution_rate):
     """Predicts how many days are required to reach the milestone."""
     if contribution_rate <= 0:
@@ -101,48 +250,84 @@ def predict_days_to_milestone(current_contributions, milestone, contribution_rat
     return days_required
 
 
+DEFAULT_MILESTONES = [100, 500, 1000, 2000, 5000, 10000]
+
+def parse_milestones(text: str) -> list:
+    """
+    Parses a comma separated list of milestone targets.
+
+    Args:
+        text (str): User input, e.g. "100, 500, 1k".
+
+    Returns:
+        list: Sorted unique positive milestones, or an empty list if any entry is invalid.
+    """
+    milestones = set()
+    for part in text.replace(";", ",").split(","):
+        part = part.strip().lower().replace("_", "")
+        if not part:
+            continue
+        multiplier = 1000 if part.endswith("k") else 1
+        part = part[:-1] if part.endswith("k") else part
+        if not part.isdigit() or int(part) * multiplier <= 0:
+            return []
+        milestones.add(int(part) * multiplier)
+    return sorted(milestones)
+
+def find_milestone_dates(milestones, contributions, total_contributions, contribution_rate, now: datetime = None):
+    """
+    Finds achievement dates for any number of milestones at once.
+
+    A cumulative sum of the daily counts is built once and each milestone is located with
+    a binary search; milestones not reached yet are projected from the contribution rate.
+
+    Args:
+    - milestones (array-like): Milestone commit targets.
+    - contributions (ContributionSeries): Daily contribution counts.
+    - total_contributions (int): Current total contributions.
+    - contribution_rate (float): Daily contribution rate.
+    - now (datetime): Reference time for projections. Defaults to now.
+
+    Returns:
+    - tuple: ``(dates, achieved)`` arrays; ``dates`` is ``datetime64[D]`` with NaT for milestones that
+      cannot be reached, ``achieved`` marks milestones already reached in the series.
+    """
+    milestones = np.asarray(milestones, dtype=np.int64)
+    cumulative = np.cumsum(contributions.counts, dtype=np.int64)
+
+    # The first day the running total reaches a milestone is always an active day
+    index = np.searchsorted(cumulative, np.maximum(milestones, 1), side="left")
+    achieved = index < len(cumulative)
+    dates = np.full(len(milestones), np.datetime64("NaT"), dtype="datetime64[D]")
+    dates[achieved] = contributions.dates[index[achieved]]
+
+    if contribution_rate > 0:
+        now = np.datetime64(now or datetime.now(), "s")
+        seconds = (milestones[~achieved] - total_contributions) / contribution_rate * 86400
+        dates[~achieved] = (now + seconds.astype("timedelta64[s]")).astype("datetime64[D]")
+    return dates, achieved
+
 def get_milestone_dates(milestones, contributions, total_contributions, contribution_rate):
     """
     Finds the exact dates when milestones were achieved from GraphQL data and predicts future ones.
 
     Args:
     - milestones (list): List of milestone commit targets.
-    - contributions (list): Contribution data from GraphQL (weeks > contributionDays).
+    - contributions (ContributionSeries | list): Contribution series, or contribution data from GraphQL (weeks > contributionDays).
     - total_contributions (int): Current total contributions.
     - contribution_rate (float): Daily contribution rate.
 
     Returns:
     - dict: Milestone predictions with exact dates (if achieved) and estimated dates (if not achieved).
     """
-    milestone_dates = {}
-    cumulative_contributions = 0
-
-    # --- Traverse through contributions to find exact dates ---
-    for week in contributions:
-        for day in week["contributionDays"]:
-            contribution_count = day["contributionCount"]
-            date = day["date"]
-
-            if contribution_count > 0:
-                cumulative_contributions += contribution_count
+    from contribution_series import ContributionSeries
 
-                # If a milestone is reached, store its exact date
-                for milestone in milestones:
-                    if milestone not in milestone_dates and cumulative_contributions >= milestone:
-                        milestone_dates[milestone] = date
-
-    # --- Predict future milestone dates ---
-    today = datetime.now()
-    if contribution_rate > 0:
-        for milestone in milestones:
-            if milestone not in milestone_dates:  # Only predict if not already achieved
-                remaining_commits = milestone - total_contributions
-                days_to_milestone = remaining_commits / contribution_rate
-                milestone_dates[milestone] = (today + timedelta(days=days_to_milestone)).strftime("%Y-%m-%d")
-    else:
-        for milestone in milestones:
-            if milestone not in milestone_dates:
-                milestone_dates[milestone] = "Not achievable"
-
-    return milestone_dates
+    if not isinstance(contributions, ContributionSeries):
+        days = [day for week in contributions for day in week["contributionDays"]]
+        contributions = ContributionSeries.from_days([day["date"] for day in days], [day["contributionCount"] for day in days])
 
+    dates, _ = find_milestone_dates(milestones, contributions, total_contributions, contribution_rate)
+    return {
+        milestone: "Not achievable" if np.isnat(day) else str(day)
+        for milestone, day in zip(milestones, dates)
+    }